@@ -1,14 +1,22 @@
 import time
+import json
 import psutil
 import pandas as pd
 import io
-from fastapi import APIRouter, UploadFile, File
-from fastapi.responses import JSONResponse
-
-from api.services.ocr_service import extract_text_from_pdf
-from api.services.gemini_service import summarize_with_gemini, analyze_tabular_data_with_gemini
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from api.services.ocr_service import extract_text_and_pages
+from api.services.gemini_service import (
+    summarize_with_gemini, analyze_tabular_data_with_gemini, get_gemini_status, DEFAULT_DEADLINE_S
+)
 from api.services.classification_service import classify_text, KEYWORDS
 from api.services.reasoning_service import explain_reasoning
+from api.services.classifier_model import record_training_pair
+from api.services.statement_service import extract_statement_table, summarize_statement
+from api.utils.memory import AdmissionRejected, admission, estimate_request_mb, track_request_memory
 
 router = APIRouter()
 
@@ -22,85 +30,221 @@ def get_metrics(start_time):
     return {"latency_s": latency, "cpu_percent": cpu_percent}
 
 
+# ---------------------------------------------------------
+# 🔹 Pipeline: yields (stage, payload) as each step finishes
+# ---------------------------------------------------------
+async def run_pipeline(file: UploadFile, start_time: float, deadline: float):
+    """
+    Runs the analysis pipeline for one upload and yields (stage, payload)
+    tuples as soon as each stage completes. The last stage is always
+    "result", carrying the combined response. Blocking OCR and table
+    parsing run in the threadpool; Gemini calls are awaited on their own
+    pool, so slow Gemini answers cannot starve the threadpool.
+    """
+    file_name = file.filename.lower()
+
+    # -------------------------------
+    # 1️⃣ TABULAR FILES (CSV/Excel)
+    # -------------------------------
+    if file_name.endswith((".csv", ".xlsx", ".xls")):
+        file_bytes = await file.read()
+
+        if file_name.endswith(".csv"):
+            df = await run_in_threadpool(pd.read_csv, io.BytesIO(file_bytes))
+        else:
+            df = await run_in_threadpool(pd.read_excel, io.BytesIO(file_bytes))
+        yield "parsed", {"rows": len(df), "columns": len(df.columns)}
+
+        gemini_data = await analyze_tabular_data_with_gemini(df, deadline=deadline)
+        yield "gemini", gemini_data
+
+        result = {
+            "Filename": file.filename,
+            "Predicted Label": "Tabular Data",
+            "Confidence": "N/A",
+            "Reasoning": "Detected tabular structure, processed with Gemini analytics model.",
+            **get_metrics(start_time),
+            **gemini_data
+        }
+        yield "result", result
+        return
+
+    # -------------------------------
+    # 2️⃣ DOCUMENTS (PDF/Image)
+    # -------------------------------
+    # ✅ Await the async OCR extraction
+    text, page_count = await extract_text_and_pages(file)
+
+    # Safety: Ensure we always have a string
+    if not isinstance(text, str):
+        text = str(text)
+    yield "ocr", {"pages": page_count, "characters": len(text), "ocr_ok": not text.startswith("⚠️")}
+
+    # Step 2: Classification
+    label, confidence = classify_text(text)
+
+    # Step 3: Reasoning
+    reasoning = explain_reasoning(text, label, KEYWORDS)
+    yield "classification", {"label": label, "confidence": confidence, "reasoning": reasoning}
+
+    # Step 3b: Bank statements → layout-aware table + local analytics
+    statement_summary = None
+    if label == "Bank Statement" and file_name.endswith(".pdf"):
+        await file.seek(0)
+        table = await run_in_threadpool(extract_statement_table, await file.read())
+        if table is not None:
+            statement_summary = summarize_statement(table)
+            yield "statement", statement_summary
+
+    # Step 4: Gemini Summarization
+    gemini_data = await summarize_with_gemini(text, label, statement_summary, deadline=deadline)
+    yield "gemini", gemini_data if isinstance(gemini_data, dict) else {"summary": str(gemini_data)}
+
+    # Step 5: Combine results
+    metrics = get_metrics(start_time)
+    result = {
+        "Filename": file.filename,
+        "Predicted Label": label,
+        "Confidence": confidence,
+        "Reasoning": reasoning,
+        **metrics
+    }
+    if statement_summary:
+        result["Statement Analytics"] = statement_summary
+
+    # Merge Gemini data (structured)
+    if isinstance(gemini_data, dict):
+        result.update(gemini_data)
+        if not gemini_data.get("degraded"):
+            record_training_pair(text, gemini_data.get("confirmed_label"))
+    else:
+        result["Summary"] = str(gemini_data)
+
+    yield "result", result
+
+
+# Smallest budget a client can ask for; tinier values are raised to this
+MIN_DEADLINE_S = 1.0
+
+
+def _request_deadline(deadline_ms: Optional[int]) -> float:
+    budget_s = max(deadline_ms / 1000, MIN_DEADLINE_S) if deadline_ms else DEFAULT_DEADLINE_S
+    return time.monotonic() + budget_s
+
+
 # ---------------------------------------------------------
 # 🔹 Main route: document analysis (PDF, Image, CSV, Excel)
 # ---------------------------------------------------------
 @router.post("/analyze/")
-async def analyze_document(file: UploadFile = File(...)):
+async def analyze_document(
+    file: UploadFile = File(...),
+    deadline_ms: Optional[int] = Header(None, alias="X-Deadline-Ms", gt=0),
+):
     """
     Main route for AI document processing — supports:
     - PDFs / Images via OCR
     - CSV / Excel via Gemini Tabular Analyzer
+    The optional X-Deadline-Ms header sets the request's total time budget;
+    Gemini gets whatever is left after local processing.
+    Uploads are admitted against the worker memory budget (413 if too large,
+    503 if the queue is full) and report per-stage memory under "memory".
     """
     start_time = time.time()
-    file_name = file.filename.lower()
-    print(f"🧾 Processing: {file_name}")
+    deadline = _request_deadline(deadline_ms)
+    print(f"🧾 Processing: {file.filename.lower()}")
 
     try:
-        # -------------------------------
-        # 1️⃣ TABULAR FILES (CSV/Excel)
-        # -------------------------------
-        if file_name.endswith((".csv", ".xlsx", ".xls")):
-            file_bytes = await file.read()
-
-            if file_name.endswith(".csv"):
-                df = pd.read_csv(io.BytesIO(file_bytes))
-            else:
-                df = pd.read_excel(io.BytesIO(file_bytes))
-
-            gemini_data = analyze_tabular_data_with_gemini(df)
-
-            result = {
-                "Filename": file.filename,
-                "Predicted Label": "Tabular Data",
-                "Confidence": "N/A",
-                "Reasoning": "Detected tabular structure, processed with Gemini analytics model.",
-                **get_metrics(start_time),
-                **gemini_data
-            }
-
-            return JSONResponse(content=result)
-
-        # -------------------------------
-        # 2️⃣ DOCUMENTS (PDF/Image)
-        # -------------------------------
-        else:
-            # ✅ Await the async OCR extraction
-            text = await extract_text_from_pdf(file)
+        need_mb = estimate_request_mb(file)
+        async with admission.reserve(need_mb), track_request_memory(need_mb) as memory:
+            result = None
+            async for stage, payload in run_pipeline(file, start_time, deadline):
+                memory.mark(stage)
+                if stage == "result":
+                    result = payload
+            result["memory"] = memory.report()
+        return JSONResponse(content=result)
+
+    except AdmissionRejected as e:
+        return JSONResponse(content={"error": str(e)}, status_code=e.status_code)
 
-            # Safety: Ensure we always have a string
-            if not isinstance(text, str):
-                text = str(text)
+    except Exception as e:
+        return JSONResponse(
+            content={"error": f"⚠️ Internal error: {str(e)}"},
+            status_code=500
+        )
 
-            # Step 2: Classification
-            label, confidence = classify_text(text)
 
-            # Step 3: Reasoning
-            reasoning = explain_reasoning(text, label, KEYWORDS)
+# ---------------------------------------------------------
+# 🔹 Streaming route: one Server-Sent Event per stage
+# ---------------------------------------------------------
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
-            # Step 4: Gemini Summarization
-            gemini_data = summarize_with_gemini(text, label)
 
-            # Step 5: Combine results
-            metrics = get_metrics(start_time)
-            result = {
-                "Filename": file.filename,
-                "Predicted Label": label,
-                "Confidence": confidence,
-                "Reasoning": reasoning,
-                **metrics
-            }
+@router.post("/analyze/stream")
+async def analyze_document_stream(
+    file: UploadFile = File(...),
+    deadline_ms: Optional[int] = Header(None, alias="X-Deadline-Ms", gt=0),
+):
+    """
+    Same pipeline as /analyze/, streamed as Server-Sent Events:
+    (queued) → parsed → gemini → done for tables, and
+    (queued) → ocr → classification → (statement) → gemini → done for
+    documents. Stage events carry stage_s, elapsed_s and that stage's
+    memory record; "done" holds the full result. Failures end the stream
+    with an "error" event (with status_code for admission rejections).
+    Uploads rejected up front get a plain JSON 413/503 instead.
+    """
+    start_time = time.time()
+    deadline = _request_deadline(deadline_ms)
+    print(f"🧾 Streaming: {file.filename.lower()}")
 
-            # Merge Gemini data (structured)
-            if isinstance(gemini_data, dict):
-                result.update(gemini_data)
-            else:
-                result["Summary"] = str(gemini_data)
+    # Reject before streaming so the client still gets a proper status code
+    need_mb = estimate_request_mb(file)
+    try:
+        admission.check(need_mb)
+    except AdmissionRejected as e:
+        return JSONResponse(content={"error": str(e)}, status_code=e.status_code)
+
+    async def events():
+        try:
+            if admission.must_wait(need_mb):
+                yield _sse("queued", {"estimated_mb": round(need_mb, 2), **admission.snapshot()})
+
+            async with admission.reserve(need_mb), track_request_memory(need_mb) as memory:
+                stage_start = time.time()
+                async for stage, payload in run_pipeline(file, start_time, deadline):
+                    now = time.time()
+                    timing = {"stage_s": round(now - stage_start, 3), "elapsed_s": round(now - start_time, 3)}
+                    stage_start = now
+                    stage_memory = memory.mark(stage)
+                    if stage == "result":
+                        yield _sse("done", {**payload, **timing, "memory": memory.report()})
+                    else:
+                        yield _sse(stage, {**payload, **timing, "memory": stage_memory})
+        except AdmissionRejected as e:
+            yield _sse("error", {"error": str(e), "status_code": e.status_code})
+        except Exception as e:
+            yield _sse("error", {"error": f"⚠️ Internal error: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-            return JSONResponse(content=result)
 
-    except Exception as e:
-        return JSONResponse(
-            content={"error": f"⚠️ Internal error: {str(e)}"},
-            status_code=500
-        )
+# ---------------------------------------------------------
+# 🔹 Gemini health: breaker state + hedge rate
+# ---------------------------------------------------------
+@router.get("/status/gemini")
+async def gemini_status():
+    return get_gemini_status()
+
+
+# ---------------------------------------------------------
+# 🔹 Memory: worker budget, reservations and admission stats
+# ---------------------------------------------------------
+@router.get("/status/memory")
+async def memory_status():
+    return admission.snapshot()
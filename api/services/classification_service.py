@@ -1,5 +1,8 @@
 # api/services/classification_service.py
 import re
+from typing import List, Tuple
+
+from api.services.classifier_model import get_model
 
 # ======================================================
 # 🔹 Keyword Library for Financial Document Classification
@@ -30,18 +33,14 @@ KEYWORDS = {
 }
 
 # ======================================================
-# 🔹 Classification Function
+# 🔹 Keyword Fallback (used until a trained model exists)
 # ======================================================
-def classify_text(text: str):
+def classify_with_keywords(text: str):
     """
-    Classifies financial document text into categories
-    such as Invoice, Receipt, Bank Statement, etc.
+    Scores each label by how many of its keywords appear in the text.
     Returns:
         (label, confidence_score)
     """
-    if not text or len(text.strip()) == 0:
-        return "Unknown", 0.0
-
     text_lower = text.lower()
     best_match = "Unknown"
     max_score = 0
@@ -56,3 +55,40 @@ def classify_text(text: str):
     confidence = round(min(max_score / 5, 1.0), 2)
 
     return best_match, confidence
+
+
+# ======================================================
+# 🔹 Classification Functions
+# ======================================================
+def classify_texts(texts: List[str]) -> List[Tuple[str, float]]:
+    """
+    Classifies a batch of documents. With a trained model the batch is
+    tokenized per document, then hashed and scored with NumPy/SciPy array
+    operations, and confidence is a calibrated probability; otherwise each
+    document goes through the keyword rules.
+    """
+    results = [("Unknown", 0.0)] * len(texts)
+    # Empty text and OCR error messages ("⚠️ ...") carry no document signal
+    pending = [i for i, text in enumerate(texts) if text and text.strip() and not text.startswith("⚠️")]
+    if not pending:
+        return results
+
+    model = get_model()
+    if model is None:
+        for i in pending:
+            results[i] = classify_with_keywords(texts[i])
+        return results
+
+    for i, prediction in zip(pending, model.predict([texts[i] for i in pending])):
+        results[i] = prediction
+    return results
+
+
+def classify_text(text: str):
+    """
+    Classifies financial document text into categories
+    such as Invoice, Receipt, Bank Statement, etc.
+    Returns:
+        (label, confidence_score)
+    """
+    return classify_texts([text])[0]
@@ -0,0 +1,258 @@
+# api/services/classifier_model.py
+import json
+import os
+import string
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import minimize
+from scipy.special import logsumexp
+
+# ==========================================================
+# 🔹 Configuration
+# ==========================================================
+MODEL_PATH = os.environ.get("CLASSIFIER_MODEL_PATH", "data/doc_classifier.npz")
+
+# Opt-in: append (text, confirmed_label) pairs here for offline training
+TRAINING_LOG = os.environ.get("CLASSIFIER_TRAINING_LOG")
+
+N_FEATURES = 2 ** 18
+# Temperatures outside this range mean the holdout is too small or separable
+TEMPERATURE_RANGE = (0.05, 20.0)
+MAX_CHARS = 5000  # the opening of a document carries its type
+# Tokens are runs of [a-z0-9]; every other byte becomes a separator
+TOKEN_BYTES = (string.ascii_lowercase + string.digits).encode()
+TOKEN_TABLE = bytes(c if c in TOKEN_BYTES else 32 for c in range(256))
+# Tokens are hashed from their first TOKEN_WIDTH bytes, eight at a time
+TOKEN_WIDTH = 32
+# Bump when the feature hashing changes; older model files must be retrained
+FEATURE_VERSION = 2
+
+
+# ----------------------------------------------------------
+# 1️⃣ Hashed n-gram features
+# ----------------------------------------------------------
+def _mix(h: np.ndarray) -> np.ndarray:
+    """MurmurHash3 64-bit finalizer: spreads every input bit into the low bits."""
+    h = (h ^ (h >> np.uint64(33))) * np.uint64(0xFF51AFD7ED558CCD)
+    h = (h ^ (h >> np.uint64(33))) * np.uint64(0xC4CEB9FE1A85EC53)
+    return h ^ (h >> np.uint64(33))
+
+
+def _hash_grams(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Maps word unigrams and bigrams of a batch to (row, column) feature
+    pairs. Tokens are packed into a fixed-width byte array and hashed with
+    NumPy integer arithmetic (stable across processes, unlike hash());
+    bigram hashes are mixed from their two token hashes, so there is no
+    per-gram Python work after tokenizing.
+    """
+    tokens = [
+        (text or "")[:MAX_CHARS].lower().encode("ascii", "replace").translate(TOKEN_TABLE).split()
+        for text in texts
+    ]
+    flat = [token for doc_tokens in tokens for token in doc_tokens]
+    words = np.array(flat, dtype=f"S{TOKEN_WIDTH}").view("<u8").reshape(-1, TOKEN_WIDTH // 8)
+
+    hashes = np.zeros(len(flat), dtype=np.uint64)
+    for column in words.T:
+        hashes = _mix(hashes ^ column)
+
+    rows = np.repeat(np.arange(len(texts)), [len(doc_tokens) for doc_tokens in tokens])
+    # Bigrams only pair neighbouring tokens of the same document
+    same_doc = rows[:-1] == rows[1:]
+    bigrams = _mix(hashes[:-1] * np.uint64(0x9E3779B97F4A7C15) ^ hashes[1:])[same_doc]
+
+    columns = np.concatenate((hashes, bigrams)) % np.uint64(N_FEATURES)
+    return np.concatenate((rows, rows[:-1][same_doc])), columns.astype(np.int32)
+
+
+def vectorize(texts: List[str]) -> sparse.csr_matrix:
+    """
+    Builds an L2-normalised CSR matrix of log-scaled hashed n-gram counts,
+    one row per document.
+    """
+    rows, columns = _hash_grams(texts)
+    # Count repeated (row, column) pairs with one sort over combined keys
+    keys = np.sort(rows.astype(np.int64) * N_FEATURES + columns)
+    starts = np.flatnonzero(np.diff(keys, prepend=-1))
+    counts = np.diff(np.append(starts, len(keys))).astype(np.float32)
+    unique_rows, unique_columns = np.divmod(keys[starts], N_FEATURES)
+    indptr = np.searchsorted(unique_rows, np.arange(len(texts) + 1))
+    matrix = sparse.csr_matrix(
+        (counts, unique_columns.astype(np.int32), indptr), shape=(len(texts), N_FEATURES)
+    )
+    np.log1p(matrix.data, out=matrix.data)
+
+    rows = np.repeat(np.arange(len(texts)), np.diff(matrix.indptr))
+    norms = np.sqrt(np.bincount(rows, weights=matrix.data ** 2, minlength=len(texts)))
+    norms[norms == 0] = 1.0
+    matrix.data /= norms[rows].astype(np.float32)
+    return matrix
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    return np.exp(scores - logsumexp(scores, axis=1, keepdims=True))
+
+
+# ----------------------------------------------------------
+# 2️⃣ Linear model (multinomial logistic regression)
+# ----------------------------------------------------------
+class LinearDocClassifier:
+    """
+    Multinomial logistic regression over hashed n-grams, with a single
+    temperature fitted on held-out data so probabilities are calibrated.
+    """
+
+    def __init__(self, labels: List[str], weights: np.ndarray, bias: np.ndarray, temperature: float = 1.0):
+        self.labels = list(labels)
+        self.weights = weights
+        self.bias = bias
+        self.temperature = temperature
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        scores = vectorize(texts) @ self.weights + self.bias
+        return _softmax(scores / self.temperature)
+
+    def predict(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """Scores a batch of documents in one sparse matrix product."""
+        probabilities = self.predict_proba(texts)
+        best = probabilities.argmax(axis=1)
+        return [(self.labels[i], round(float(p), 2)) for i, p in zip(best, probabilities[np.arange(len(best)), best])]
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        rows = np.flatnonzero(np.abs(self.weights).sum(axis=1))
+        np.savez_compressed(
+            path,
+            labels=np.array(self.labels),
+            rows=rows.astype(np.int32),
+            weights=self.weights[rows].astype(np.float32),
+            bias=self.bias,
+            temperature=self.temperature,
+            feature_version=FEATURE_VERSION,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LinearDocClassifier":
+        with np.load(path) as saved:
+            version = int(saved["feature_version"]) if "feature_version" in saved.files else 1
+            if version != FEATURE_VERSION:
+                raise ValueError(f"Model uses feature version {version}, expected {FEATURE_VERSION}; retrain it.")
+            labels = [str(label) for label in saved["labels"]]
+            weights = np.zeros((N_FEATURES, len(labels)), dtype=np.float32)
+            weights[saved["rows"]] = saved["weights"]
+            return cls(labels, weights, saved["bias"], float(saved["temperature"]))
+
+
+def _fit_weights(X: sparse.csr_matrix, y: np.ndarray, n_classes: int, l2: float) -> Tuple[np.ndarray, np.ndarray]:
+    n_samples = X.shape[0]
+    targets = np.zeros((n_samples, n_classes))
+    targets[np.arange(n_samples), y] = 1.0
+    # Only columns that occur in training can get non-zero weights
+    active = np.unique(X.indices)
+    X_active = X[:, active]
+
+    def loss_and_grad(params):
+        W = params[:-n_classes].reshape(len(active), n_classes)
+        b = params[-n_classes:]
+        scores = X_active @ W + b
+        log_norm = logsumexp(scores, axis=1, keepdims=True)
+        loss = -(targets * (scores - log_norm)).sum() / n_samples + 0.5 * l2 * (W ** 2).sum()
+        residual = (np.exp(scores - log_norm) - targets) / n_samples
+        grad_W = X_active.T @ residual + l2 * W
+        return loss, np.concatenate([grad_W.ravel(), residual.sum(axis=0)])
+
+    start = np.zeros(len(active) * n_classes + n_classes)
+    result = minimize(loss_and_grad, start, jac=True, method="L-BFGS-B", options={"maxiter": 500})
+
+    weights = np.zeros((N_FEATURES, n_classes), dtype=np.float32)
+    weights[active] = result.x[:-n_classes].reshape(len(active), n_classes)
+    return weights, result.x[-n_classes:]
+
+
+def _fit_temperature(scores: np.ndarray, y: np.ndarray) -> Tuple[float, bool]:
+    """
+    Picks the temperature minimising held-out negative log-likelihood within
+    TEMPERATURE_RANGE. Also returns whether the optimum sat on the range
+    edge, i.e. the clamped value is a bound rather than a fit.
+    """
+    def nll(log_t):
+        scaled = scores / np.exp(log_t)
+        return -(scaled[np.arange(len(y)), y] - logsumexp(scaled, axis=1)).mean()
+
+    grid = np.linspace(np.log(TEMPERATURE_RANGE[0]), np.log(TEMPERATURE_RANGE[1]), 200)
+    best = int(np.argmin([nll(log_t) for log_t in grid]))
+    return float(np.exp(grid[best])), best in (0, len(grid) - 1)
+
+
+def train_classifier(texts: List[str], labels: List[str], l2: float = 1e-4,
+                     holdout: float = 0.2, seed: int = 42) -> Tuple[LinearDocClassifier, dict]:
+    """
+    Trains the classifier from (text, label) pairs. The weights are fit on
+    all but a random holdout, and the temperature is fit on that holdout's
+    scores from the same weights, so the shipped probabilities are the
+    calibrated ones. With fewer than 20 samples there is no holdout: the
+    model uses all data and is reported as uncalibrated.
+    """
+    classes = sorted(set(labels))
+    if len(classes) < 2:
+        raise ValueError("Need at least two distinct labels to train a classifier.")
+
+    X = vectorize(texts)
+    y = np.array([classes.index(label) for label in labels])
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(y))
+    n_holdout = int(len(y) * holdout) if len(y) >= 20 else 0
+    held, fit = order[:n_holdout], order[n_holdout:]
+
+    report = {"samples": len(y), "classes": classes, "holdout": n_holdout, "calibrated": bool(n_holdout)}
+    weights, bias = _fit_weights(X[fit], y[fit], len(classes), l2)
+    temperature = 1.0
+    if n_holdout:
+        scores = X[held] @ weights + bias
+        temperature, at_edge = _fit_temperature(scores, y[held])
+        report["holdout_accuracy"] = round(float((scores.argmax(axis=1) == y[held]).mean()), 4)
+        report["temperature_at_range_edge"] = at_edge
+
+    report["temperature"] = round(temperature, 4)
+    return LinearDocClassifier(classes, weights, bias, temperature), report
+
+
+# ----------------------------------------------------------
+# 3️⃣ Lazy model loading + training data collection
+# ----------------------------------------------------------
+_model: Optional[LinearDocClassifier] = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def get_model() -> Optional[LinearDocClassifier]:
+    """
+    Loads the trained model on first use. Returns None when no model file
+    exists, so callers can fall back to keyword rules.
+    """
+    global _model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                _model = None
+                if os.path.exists(MODEL_PATH):
+                    try:
+                        _model = LinearDocClassifier.load(MODEL_PATH)
+                    except ValueError as e:
+                        print(f"⚠️ Ignoring {MODEL_PATH}: {e}")
+                _model_loaded = True
+    return _model
+
+
+def record_training_pair(text: str, confirmed_label: str):
+    """Appends a Gemini-confirmed example to the training log, if enabled."""
+    if not TRAINING_LOG or not text or not confirmed_label or confirmed_label == "N/A":
+        return
+    os.makedirs(os.path.dirname(TRAINING_LOG) or ".", exist_ok=True)
+    with open(TRAINING_LOG, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps({"text": text[:MAX_CHARS], "confirmed_label": confirmed_label}) + "\n")
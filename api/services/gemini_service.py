@@ -1,10 +1,14 @@
 # api/services/gemini_service.py
 import os
 import json
+import time
 import pandas as pd
+from typing import Optional
 from google import genai
 from dotenv import load_dotenv
 
+from api.services.resilience import CircuitBreaker, CircuitOpen, DeadlineExceeded, HedgedCaller
+
 # ==========================================================
 # 🔹 Load environment variables from .env
 # ==========================================================
@@ -17,16 +21,97 @@ if not api_key:
 # ==========================================================
 # 🔹 Initialize Gemini Client (for google-genai==1.49.0)
 # ==========================================================
-client = genai.Client(api_key=api_key)
+# GEMINI_BASE_URL points the client at another endpoint (e.g. the benchmark stub)
+base_url = os.environ.get("GEMINI_BASE_URL")
+client = genai.Client(
+    api_key=api_key,
+    http_options={"base_url": base_url} if base_url else None,
+)
+
+# ==========================================================
+# 🔹 Deadlines, hedging and circuit breaking
+# ==========================================================
+GEMINI_MODEL = "models/gemini-2.0-flash"
+DEFAULT_DEADLINE_S = float(os.environ.get("GEMINI_DEADLINE_S", "30"))
+
+gemini_caller = HedgedCaller(
+    CircuitBreaker(
+        failure_rate=float(os.environ.get("GEMINI_BREAKER_FAILURE_RATE", "0.5")),
+        window=int(os.environ.get("GEMINI_BREAKER_WINDOW", "20")),
+        min_calls=int(os.environ.get("GEMINI_BREAKER_MIN_CALLS", "10")),
+        cooldown_s=float(os.environ.get("GEMINI_BREAKER_COOLDOWN_S", "30")),
+    ),
+    hedge_percentile=float(os.environ.get("GEMINI_HEDGE_PERCENTILE", "95")),
+    default_hedge_delay_s=float(os.environ.get("GEMINI_HEDGE_DELAY_S", "5")),
+    min_attempt_s=float(os.environ.get("GEMINI_MIN_ATTEMPT_S", "2")),
+    max_workers=int(os.environ.get("GEMINI_MAX_WORKERS", "32")),
+)
+
+
+async def _generate(prompt: str, deadline: Optional[float]):
+    """
+    Calls Gemini under the request's deadline (absolute time.monotonic()),
+    hedging slow calls and honouring the circuit breaker. The blocking SDK
+    call runs on the caller's own pool; this coroutine only awaits it.
+    """
+    def attempt(timeout_s):
+        return client.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=prompt,
+            config={"http_options": {"timeout": max(1, int(timeout_s * 1000))}},
+        )
+
+    return await gemini_caller.call(attempt, deadline or time.monotonic() + DEFAULT_DEADLINE_S)
+
+
+def get_gemini_status():
+    """Breaker state, hedge rate and latency figures for monitoring."""
+    return gemini_caller.snapshot()
+
+
+def _parse_response(response):
+    text_output = getattr(response, "text", None) or str(response)
+
+    # ✅ Try to parse JSON-like structured output
+    if "{" in text_output and "}" in text_output:
+        try:
+            json_str = text_output[text_output.index("{"): text_output.rindex("}") + 1]
+            return json.loads(json_str)
+        except Exception:
+            pass  # fallback
+
+    return {"summary": text_output.strip()}
+
+
+def _degraded_document_result(label: str, reason: str):
+    """Local-only answer used when Gemini is skipped or fails."""
+    return {
+        "summary": f"⚠️ Gemini unavailable ({reason}). Showing local classification only.",
+        "confirmed_label": label,
+        "invoice_number": None,
+        "total_amount": None,
+        "invoice_date": None,
+        "due_date": None,
+        "vendor_name": None,
+        "tax_rate": None,
+        "tax_amount": None,
+        "subtotal": None,
+        "degraded": True,
+        "degraded_reason": reason,
+    }
 
 
 # ----------------------------------------------------------
 # 1️⃣ For PDFs / Images / OCR-based Documents
 # ----------------------------------------------------------
-def summarize_with_gemini(document_text: str, label: str):
+async def summarize_with_gemini(document_text: str, label: str, statement_summary: Optional[dict] = None,
+                          deadline: Optional[float] = None):
     """
     Summarizes unstructured OCR text (PDF/Image) using Gemini Flash.
     Compatible with google-genai==1.49.0 syntax.
+    When locally computed statement analytics are given, they are sent
+    in place of the raw transaction rows. If Gemini is out of budget or
+    its breaker is open, a local-only result marked "degraded" is returned.
     """
 
     if (
@@ -50,6 +135,15 @@ def summarize_with_gemini(document_text: str, label: str):
 
     truncated_text = document_text[:6000]
 
+    statement_context = ""
+    if statement_summary:
+        truncated_text = document_text[:1500]
+        statement_context = f"""
+    The transaction table was parsed locally. These figures are exact, use them
+    instead of estimating from the text:
+    {json.dumps(statement_summary, indent=2)}
+    """
+
     prompt = f"""
     You are a professional financial document analysis AI.
 
@@ -57,6 +151,7 @@ def summarize_with_gemini(document_text: str, label: str):
     {truncated_text}
 
     The system classified this as: {label}.
+    {statement_context}
 
     Tasks:
     1️⃣ Summarize the document contents in 3–4 lines.
@@ -78,25 +173,12 @@ def summarize_with_gemini(document_text: str, label: str):
     """
 
     try:
-        # ✅ Use correct syntax for google-genai==1.49.0
-        response = client.models.generate_content(
-            model="models/gemini-2.0-flash",
-            contents=prompt
-        )
-
-        # ✅ Extract model text output properly
-        text_output = getattr(response, "text", None) or str(response)
-
-        # ✅ Try to parse JSON-like structured output
-        if "{" in text_output and "}" in text_output:
-            try:
-                json_str = text_output[text_output.index("{"): text_output.rindex("}") + 1]
-                return json.loads(json_str)
-            except Exception:
-                pass  # fallback
-
-        return {"summary": text_output.strip()}
+        return _parse_response(await _generate(prompt, deadline))
 
+    except CircuitOpen:
+        return _degraded_document_result(label, "circuit open")
+    except DeadlineExceeded:
+        return _degraded_document_result(label, "deadline exceeded")
     except Exception as e:
         return {
             "summary": f"⚠️ Gemini API Error: {e}",
@@ -109,13 +191,26 @@ def summarize_with_gemini(document_text: str, label: str):
             "tax_rate": None,
             "tax_amount": None,
             "subtotal": None,
+            "degraded": True,
+            "degraded_reason": "error",
         }
 
 
 # ----------------------------------------------------------
 # 2️⃣ For CSV / Excel / Structured Tabular Data
 # ----------------------------------------------------------
-def analyze_tabular_data_with_gemini(df: pd.DataFrame):
+def _degraded_tabular_result(df: pd.DataFrame, reason: str):
+    numeric = df.select_dtypes("number")
+    totals = {column: round(float(value), 2) for column, value in numeric.sum().items()}
+    return {
+        "summary": f"⚠️ Gemini unavailable ({reason}). {len(df)} rows × {len(df.columns)} columns analysed locally.",
+        "insights": f"Column totals: {totals}" if totals else "No numeric columns found.",
+        "degraded": True,
+        "degraded_reason": reason,
+    }
+
+
+async def analyze_tabular_data_with_gemini(df: pd.DataFrame, deadline: Optional[float] = None):
     """
     Uses Gemini Flash to analyze financial datasets (CSV/Excel).
     Works with google-genai==1.49.0 syntax.
@@ -149,21 +244,11 @@ def analyze_tabular_data_with_gemini(df: pd.DataFrame):
     """
 
     try:
-        response = client.models.generate_content(
-            model="models/gemini-2.0-flash",
-            contents=prompt
-        )
-
-        text_output = getattr(response, "text", None) or str(response)
-
-        if "{" in text_output and "}" in text_output:
-            try:
-                json_str = text_output[text_output.index("{"): text_output.rindex("}") + 1]
-                return json.loads(json_str)
-            except Exception:
-                pass
-
-        return {"summary": text_output.strip()}
+        return _parse_response(await _generate(prompt, deadline))
 
+    except CircuitOpen:
+        return _degraded_tabular_result(df, "circuit open")
+    except DeadlineExceeded:
+        return _degraded_tabular_result(df, "deadline exceeded")
     except Exception as e:
-        return {"summary": f"⚠️ Gemini API Error: {e}"}
+        return {"summary": f"⚠️ Gemini API Error: {e}", "degraded": True, "degraded_reason": "error"}
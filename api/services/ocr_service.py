@@ -3,8 +3,8 @@ import fitz  # PyMuPDF
 import pytesseract
 from PIL import Image
 import io
-import tempfile
 import asyncio
+from fastapi.concurrency import run_in_threadpool
 
 
 async def extract_text_from_pdf(file):
@@ -13,6 +13,16 @@ async def extract_text_from_pdf(file):
     Supports FastAPI UploadFile (async) input.
     Returns extracted text or a clear error message if OCR fails.
     """
+    text, _ = await extract_text_and_pages(file)
+    return text
+
+
+async def extract_text_and_pages(file):
+    """
+    Same as extract_text_from_pdf, but returns (text, page_count) so
+    callers can report progress. Images count as one page; failures as 0.
+    The PyMuPDF / Tesseract work runs in the threadpool, off the event loop.
+    """
 
     try:
         # ✅ Read bytes properly (await if async)
@@ -22,37 +32,43 @@ async def extract_text_from_pdf(file):
             else:
                 file_bytes = file.read()
         else:
-            return "⚠️ Invalid file input."
+            return "⚠️ Invalid file input.", 0
 
-        # ✅ Save temporarily for PyMuPDF or PIL
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".tmp") as tmp:
-            tmp.write(file_bytes)
-            tmp_path = tmp.name
+        return await run_in_threadpool(_extract_sync, file_bytes, file.filename)
 
+    except Exception as e:
+        return f"⚠️ OCR extraction error: {e}", 0
+
+
+def _extract_sync(file_bytes, filename):
+    """Blocking PDF text / image OCR extraction; returns (text, page_count)."""
+    try:
         text_content = ""
+        page_count = 1
 
         # ✅ Handle PDFs
-        if file.filename.lower().endswith(".pdf"):
-            with fitz.open(tmp_path) as pdf:
+        if filename.lower().endswith(".pdf"):
+            with fitz.open(stream=file_bytes, filetype="pdf") as pdf:
+                page_count = pdf.page_count
                 for page in pdf:
                     text_content += page.get_text("text")
 
         # ✅ Handle Images
-        elif file.filename.lower().endswith((".jpg", ".jpeg", ".png")):
+        elif filename.lower().endswith((".jpg", ".jpeg", ".png")):
             image = Image.open(io.BytesIO(file_bytes))
             text_content = pytesseract.image_to_string(image)
 
         else:
-            return "⚠️ Unsupported file type."
+            return "⚠️ Unsupported file type.", 0
 
         # ✅ Clean up extracted text
         text_content = text_content.strip()
 
         # ✅ If OCR fails or is empty
         if not text_content or len(text_content) < 30:
-            return "⚠️ OCR extraction failed — no readable text found."
+            return "⚠️ OCR extraction failed — no readable text found.", page_count
 
-        return text_content
+        return text_content, page_count
 
     except Exception as e:
-        return f"⚠️ OCR extraction error: {e}"
+        return f"⚠️ OCR extraction error: {e}", 0
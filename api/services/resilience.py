@@ -0,0 +1,223 @@
+# api/services/resilience.py
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call cannot finish inside its deadline budget."""
+
+
+class CircuitOpen(RuntimeError):
+    """Raised instead of calling a provider whose breaker is open."""
+
+
+# ==========================================================
+# 🔹 Circuit breaker
+# ==========================================================
+class CircuitBreaker:
+    """
+    Trips open when the failure rate over the last `window` calls reaches
+    `failure_rate` (with at least `min_calls` recorded). After `cooldown_s`
+    a single half-open probe is let through; its outcome closes the breaker
+    or re-opens it for another cooldown.
+    """
+
+    def __init__(self, failure_rate=0.5, window=20, min_calls=10, cooldown_s=30.0):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.cooldown_s = cooldown_s
+        self.outcomes = deque(maxlen=window)
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.trips = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown_s:
+                self.state = "half_open"
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self):
+        """Returns an unused half-open probe slot without recording an outcome."""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def record(self, success: bool):
+        with self.lock:
+            if self.state == "half_open":
+                self.probe_in_flight = False
+                if success:
+                    self.state = "closed"
+                    self.outcomes.clear()
+                else:
+                    self._trip()
+                return
+
+            self.outcomes.append(success)
+            failures = self.outcomes.count(False)
+            if len(self.outcomes) >= self.min_calls and failures / len(self.outcomes) >= self.failure_rate:
+                self._trip()
+
+    def _trip(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.trips += 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            recent = len(self.outcomes)
+            return {
+                "state": self.state,
+                "trips": self.trips,
+                "rejected_calls": self.rejected,
+                "recent_failure_rate": round(self.outcomes.count(False) / recent, 3) if recent else 0.0,
+            }
+
+
+# ==========================================================
+# 🔹 Latency tracking + hedged calls
+# ==========================================================
+class LatencyTracker:
+    """Rolling window of successful call latencies (seconds)."""
+
+    def __init__(self, window=200):
+        self.samples = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, q: float, min_samples=20) -> Optional[float]:
+        with self.lock:
+            if len(self.samples) < min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def _ignore_outcome(future: asyncio.Future):
+    if not future.cancelled():
+        future.exception()
+
+
+class HedgedCaller:
+    """
+    Runs a blocking call on its own thread pool under a deadline and awaits
+    it, so a slow provider never ties up the event loop or the AnyIO worker
+    threads that OCR and parsing use. If the first attempt is slower than
+    the tracked latency percentile, a second identical attempt is fired
+    and whichever succeeds first wins. Errors feed the breaker, and
+    so do timeouts, but only when the provider had at least
+    `min_attempt_s` to answer — a budget spent on local work or a tiny
+    client deadline is not the provider's fault.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, hedge_percentile=95.0, default_hedge_delay_s=5.0,
+                 min_attempt_s=2.0, max_workers=32):
+        self.breaker = breaker
+        self.min_attempt_s = min_attempt_s
+        self.latency = LatencyTracker()
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay_s = default_hedge_delay_s
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gemini")
+        self.stats = {"calls": 0, "hedged": 0, "hedge_wins": 0, "timeouts": 0, "errors": 0, "skipped_no_budget": 0}
+        self.lock = threading.Lock()
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def hedge_delay(self) -> float:
+        delay = self.latency.percentile(self.hedge_percentile)
+        return self.default_hedge_delay_s if delay is None else delay
+
+    async def call(self, fn: Callable[[float], object], deadline: float):
+        """
+        Runs fn(timeout_s) on the pool and returns its result. `deadline` is
+        an absolute time.monotonic() value. Raises CircuitOpen,
+        DeadlineExceeded or the last attempt's exception.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpen("Gemini circuit breaker is open")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self.breaker.release()
+            self._count("skipped_no_budget")
+            raise DeadlineExceeded("No time left in the request budget")
+
+        self._count("calls")
+        started = time.monotonic()
+        fair_budget = remaining >= self.min_attempt_s
+        attempts = {asyncio.wrap_future(self.pool.submit(fn, remaining)): "primary"}
+        pending = set(attempts)
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=min(self.hedge_delay(), remaining))
+            if not done and self.breaker.state == "closed":
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    attempts[asyncio.wrap_future(self.pool.submit(fn, remaining))] = "hedge"
+                    pending.update(attempts)
+                    self._count("hedged")
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, deadline - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for future in done:
+                    if future.exception() is None:
+                        self.latency.add(time.monotonic() - started)
+                        self.breaker.record(True)
+                        if attempts[future] == "hedge":
+                            self._count("hedge_wins")
+                        return future.result()
+                    error = future.exception()
+        except asyncio.CancelledError:
+            # Client went away: no outcome to record, but free the probe slot
+            self.breaker.release()
+            raise
+        finally:
+            # Abandoned attempts finish on the pool; retrieve their errors quietly
+            for future in pending:
+                future.add_done_callback(_ignore_outcome)
+
+        if pending:
+            if fair_budget:
+                self.breaker.record(False)
+            else:
+                self.breaker.release()
+            self._count("timeouts")
+            raise DeadlineExceeded(f"Gemini did not answer within {deadline - started:.1f}s")
+        self.breaker.record(False)
+        self._count("errors")
+        raise error
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            stats = dict(self.stats)
+        calls = stats["calls"] or 1
+        p = self.latency.percentile(self.hedge_percentile, min_samples=1)
+        return {
+            **stats,
+            "hedge_rate": round(stats["hedged"] / calls, 4),
+            "hedge_delay_s": round(self.hedge_delay(), 3),
+            f"p{self.hedge_percentile:g}_latency_s": round(p, 3) if p is not None else None,
+            "breaker": self.breaker.snapshot(),
+        }
@@ -0,0 +1,318 @@
+# api/services/statement_service.py
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import fitz  # PyMuPDF
+import numpy as np
+
+# ======================================================
+# 🔹 Header vocabulary for bank statement transaction grids
+# ======================================================
+HEADER_TERMS = {
+    "date": ["date"],
+    "narration": ["narration", "description", "particulars", "details", "remarks"],
+    "debit": ["debit", "withdrawal", "withdrawals", "dr"],
+    "credit": ["credit", "deposit", "deposits", "cr"],
+    "balance": ["balance"],
+}
+
+DATE_FORMATS = [
+    "%d/%m/%Y", "%d/%m/%y", "%d-%m-%Y", "%d-%m-%y", "%d.%m.%Y", "%Y-%m-%d",
+    "%d %b %Y", "%d-%b-%Y", "%d-%b-%y", "%d %b %y", "%d %B %Y", "%b %d, %Y",
+]
+
+AMOUNT_PATTERN = re.compile(r"^\(?-?[\d,]*\.?\d+\)?(?:\s*(?:cr|dr))?$", re.IGNORECASE)
+
+# Words closer than this (in PDF points) belong to the same header cell
+HEADER_GAP = 8.0
+BALANCE_TOLERANCE = 0.01
+
+
+# ----------------------------------------------------------
+# Parsing helpers
+# ----------------------------------------------------------
+@lru_cache(maxsize=4096)
+def _parse_date(value: str) -> Optional[np.datetime64]:
+    value = value.strip().rstrip(",")
+    if not value:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return np.datetime64(datetime.strptime(value, fmt).date(), "D")
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_amount(value: str, blank: float = 0.0) -> Optional[float]:
+    """
+    Parses an amount such as '1,234.56', '(50.00)' or '9,870.00 Dr'.
+    Returns None when the string is not an amount and `blank` for empty
+    cells or dashes (0 for debit/credit, NaN for an unprinted balance).
+    """
+    value = value.strip()
+    if value in ("", "-", "--"):
+        return blank
+    if not AMOUNT_PATTERN.match(value):
+        return None
+
+    lowered = value.lower()
+    negative = lowered.endswith("dr") or value.startswith("(") or value.startswith("-")
+    digits = re.sub(r"[^\d.]", "", lowered[:-2] if lowered.endswith(("cr", "dr")) else lowered)
+    if not digits or digits == ".":
+        return None
+
+    amount = float(digits)
+    return -amount if negative else amount
+
+
+def _group_rows(words: List[tuple]) -> List[List[tuple]]:
+    """
+    Clusters PyMuPDF words into visual rows by their vertical centre,
+    independent of the block/line numbering the PDF producer chose.
+    """
+    if not words:
+        return []
+
+    words = sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0]))
+    heights = np.array([w[3] - w[1] for w in words])
+    tolerance = max(float(np.median(heights)) / 2, 1.0)
+
+    rows, current, current_y = [], [], None
+    for word in words:
+        y_mid = (word[1] + word[3]) / 2
+        if current_y is not None and abs(y_mid - current_y) > tolerance:
+            rows.append(sorted(current, key=lambda w: w[0]))
+            current = []
+        if not current:
+            current_y = y_mid
+        current.append(word)
+    rows.append(sorted(current, key=lambda w: w[0]))
+    return rows
+
+
+def _detect_columns(row: List[tuple]) -> Optional[List[Dict]]:
+    """
+    Treats a row as a table header if it names the date, balance and at least
+    one of the debit/credit columns. Returns the column cells left to right.
+    """
+    if not any("balance" in word[4].lower() for word in row):
+        return None
+
+    cells = []
+    for word in row:
+        if cells and word[0] - cells[-1]["x1"] <= HEADER_GAP:
+            cells[-1]["text"] += " " + word[4]
+            cells[-1]["x1"] = word[2]
+        else:
+            cells.append({"text": word[4], "x0": word[0], "x1": word[2]})
+
+    seen = set()
+    for cell in cells:
+        tokens = re.findall(r"[a-z]+", cell["text"].lower())
+        cell["name"] = "other"
+        for name, terms in HEADER_TERMS.items():
+            if name not in seen and any(term in tokens for term in terms):
+                cell["name"] = name
+                seen.add(name)
+                break
+
+    if not {"date", "balance"} <= seen or not seen & {"debit", "credit"}:
+        return None
+
+    # Boundaries sit halfway across the gap between neighbouring header cells
+    for left, right in zip(cells, cells[1:]):
+        left["right"] = right["left"] = (left["x1"] + right["x0"]) / 2
+    cells[0]["left"], cells[-1]["right"] = float("-inf"), float("inf")
+    return cells
+
+
+def _column_of(word: tuple, columns: List[Dict]) -> str:
+    x_mid = (word[0] + word[2]) / 2
+    return next(c["name"] for c in columns if c["left"] <= x_mid < c["right"])
+
+
+def _is_continuation(row: List[tuple], previous: Optional[List[tuple]], columns: List[Dict]) -> bool:
+    """
+    A wrapped narration line sits directly below the previous row and has
+    all of its words inside the narration column.
+    """
+    if previous is None:
+        return False
+    line_height = max(w[3] - w[1] for w in row)
+    gap = min(w[1] for w in row) - max(w[3] for w in previous)
+    return gap <= line_height and all(_column_of(word, columns) == "narration" for word in row)
+
+
+def _split_row(row: List[tuple], columns: List[Dict]) -> Dict[str, str]:
+    fields = {column["name"]: [] for column in columns}
+    numeric = ("debit", "credit", "balance")
+
+    for word in row:
+        name = _column_of(word, columns)
+        # Long narrations spill past their header; keep non-amounts in narration
+        if name in numeric and _parse_amount(word[4]) is None and word[4].lower() not in ("cr", "dr"):
+            name = "narration"
+        fields.setdefault(name, []).append(word[4])
+
+    return {name: " ".join(parts) for name, parts in fields.items()}
+
+
+# ----------------------------------------------------------
+# 1️⃣ Layout-aware extraction into columnar arrays
+# ----------------------------------------------------------
+def extract_statement_table(pdf_bytes: bytes) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Rebuilds the transaction grid of a bank statement PDF from PyMuPDF word
+    coordinates. Returns typed columnar arrays (date, narration, debit,
+    credit, balance) plus the opening balance, or None if no table is found.
+    Balance is NaN on rows where the statement left it blank.
+    """
+    dates, narrations, debits, credits, balances = [], [], [], [], []
+    opening_balance = np.nan
+
+    columns = None
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf:
+        for page in pdf:
+            # Columns carry over to pages without a header; wrapped narration
+            # never does, so letterheads cannot attach to the last row
+            previous_row = None
+            for row in _group_rows(page.get_text("words")):
+                header = _detect_columns(row)
+                if header:
+                    columns = header
+                    continue
+                if columns is None:
+                    continue
+
+                fields = _split_row(row, columns)
+                date = _parse_date(fields.get("date", ""))
+                balance = _parse_amount(fields.get("balance", ""), blank=np.nan)
+
+                if date is None:
+                    narration = fields.get("narration", "").strip()
+                    if not dates and balance is not None and not np.isnan(balance) and "opening" in narration.lower():
+                        opening_balance = balance
+                    elif dates and _is_continuation(row, previous_row, columns):
+                        # Wrapped narration continues the previous transaction
+                        narrations[-1] = f"{narrations[-1]} {narration}".strip()
+                        previous_row = row
+                    continue
+
+                debit = _parse_amount(fields.get("debit", ""))
+                credit = _parse_amount(fields.get("credit", ""))
+                if balance is None or debit is None or credit is None:
+                    continue
+
+                dates.append(date)
+                narrations.append(fields.get("narration", "").strip())
+                debits.append(abs(debit))
+                credits.append(abs(credit))
+                balances.append(balance)
+                previous_row = row
+
+    if not dates:
+        return None
+
+    table = {
+        "date": np.array(dates, dtype="datetime64[D]"),
+        "narration": np.array(narrations, dtype=object),
+        "debit": np.array(debits, dtype=np.float64),
+        "credit": np.array(credits, dtype=np.float64),
+        "balance": np.array(balances, dtype=np.float64),
+    }
+
+    # Some banks print newest-first; analytics assume chronological order
+    if table["date"][0] > table["date"][-1]:
+        table = {name: values[::-1] for name, values in table.items()}
+
+    table["opening_balance"] = opening_balance
+    return table
+
+
+# ----------------------------------------------------------
+# 2️⃣ Running balance verification
+# ----------------------------------------------------------
+def check_running_balance(table: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Verifies each printed balance equals the previous printed balance plus
+    the credits minus debits in between. Rows without a printed balance
+    are carried forward and reported as consistent; the first printed
+    balance is only checked when the opening balance was printed.
+    """
+    balance = table["balance"]
+    flows = np.cumsum(table["credit"] - table["debit"])
+    printed = np.flatnonzero(~np.isnan(balance))
+    consistent = np.ones(len(balance), dtype=bool)
+    if not len(printed):
+        return consistent
+
+    previous = np.concatenate(([table.get("opening_balance", np.nan)], balance[printed[:-1]]))
+    flow_before = np.concatenate(([0.0], flows[printed[:-1]]))
+    expected = previous + flows[printed] - flow_before
+
+    consistent[printed] = np.isclose(expected, balance[printed], atol=BALANCE_TOLERANCE) | np.isnan(previous)
+    return consistent
+
+
+# ----------------------------------------------------------
+# 3️⃣ Vectorized local analytics
+# ----------------------------------------------------------
+def _rounded(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def _largest(table: Dict[str, np.ndarray], amounts: np.ndarray) -> Optional[Dict]:
+    if not len(amounts) or amounts.max() == 0:
+        return None
+    index = int(np.argmax(amounts))
+    return {
+        "date": str(table["date"][index]),
+        "narration": table["narration"][index],
+        "amount": round(float(amounts[index]), 2),
+    }
+
+
+def summarize_statement(table: Dict[str, np.ndarray]) -> Dict:
+    """
+    Computes statement-level totals and monthly flows from the columnar
+    arrays. The result is JSON-safe and small enough to hand to Gemini
+    instead of the raw transaction rows.
+    """
+    dates, debit, credit, balance = table["date"], table["debit"], table["credit"], table["balance"]
+    consistent = check_running_balance(table)
+
+    months = dates.astype("datetime64[M]")
+    unique_months, month_index = np.unique(months, return_inverse=True)
+    monthly_debit = np.bincount(month_index, weights=debit, minlength=len(unique_months))
+    monthly_credit = np.bincount(month_index, weights=credit, minlength=len(unique_months))
+
+    printed = np.flatnonzero(~np.isnan(balance))
+    opening = table.get("opening_balance", np.nan)
+    if np.isnan(opening) and len(printed):
+        first = printed[0]
+        opening = balance[first] - credit[: first + 1].sum() + debit[: first + 1].sum()
+
+    return {
+        "transaction_count": int(len(dates)),
+        "period_start": str(dates.min()),
+        "period_end": str(dates.max()),
+        "opening_balance": _rounded(opening),
+        "closing_balance": _rounded(balance[printed[-1]]) if len(printed) else None,
+        "total_debits": round(float(debit.sum()), 2),
+        "total_credits": round(float(credit.sum()), 2),
+        "debit_count": int(np.count_nonzero(debit)),
+        "credit_count": int(np.count_nonzero(credit)),
+        "min_balance": _rounded(np.nanmin(balance)) if len(printed) else None,
+        "max_balance": _rounded(np.nanmax(balance)) if len(printed) else None,
+        "largest_debit": _largest(table, debit),
+        "largest_credit": _largest(table, credit),
+        "monthly": [
+            {"month": str(month), "debits": round(float(d), 2), "credits": round(float(c), 2)}
+            for month, d, c in zip(unique_months, monthly_debit, monthly_credit)
+        ],
+        "balance_check_passed": bool(consistent.all()),
+        "balance_mismatch_rows": [int(i) for i in np.flatnonzero(~consistent)[:20]],
+    }
@@ -0,0 +1,270 @@
+# api/utils/memory.py
+import asyncio
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+
+import psutil
+from PIL import Image
+
+MB = 1024 * 1024
+
+# ==========================================================
+# 🔹 Configuration
+# ==========================================================
+# Memory requests may use on top of the worker's idle footprint
+WORKER_MEMORY_BUDGET_MB = float(os.environ.get("WORKER_MEMORY_BUDGET_MB", "1024"))
+ADMISSION_QUEUE_TIMEOUT_S = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_S", "30"))
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "16"))
+SAMPLE_INTERVAL_S = float(os.environ.get("MEMORY_SAMPLE_INTERVAL_S", "0.05"))
+# tracemalloc slows allocation-heavy code noticeably, so it is opt-in
+TRACEMALLOC_ENABLED = os.environ.get("MEMORY_TRACEMALLOC", "0") == "1"
+
+# Rough peak-memory multipliers over the upload size, per file type
+BASE_REQUEST_MB = 25.0
+SIZE_MULTIPLIERS = {
+    ".csv": 8.0,     # pandas frame + python objects for text columns
+    ".xlsx": 40.0,   # zipped XML expands heavily in openpyxl
+    ".xls": 20.0,
+    ".pdf": 4.0,     # PyMuPDF document + extracted text, read twice for statements
+}
+# Decoded RGBA bitmap plus Tesseract's working copies
+IMAGE_BYTES_PER_PIXEL = 12
+
+
+def _rss() -> int:
+    return psutil.Process().memory_info().rss
+
+
+def _traced() -> int:
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+
+def _mb(value: float) -> float:
+    return round(value / MB, 2)
+
+
+# ----------------------------------------------------------
+# 1️⃣ Per-request memory accounting
+# ----------------------------------------------------------
+class RequestMemory:
+    """
+    Tracks RSS (and tracemalloc, when enabled) for one request. Call
+    mark(stage) when a stage finishes: the delta and high-water since the
+    previous mark are attributed to that stage. Peaks come from the
+    background sampler, so they are process-wide and include overlap
+    with concurrent requests.
+    """
+
+    def __init__(self, estimate_mb: float = 0.0):
+        self.estimate_mb = estimate_mb
+        self.start_rss = self.segment_rss = self.peak_rss = self.segment_peak_rss = _rss()
+        self.start_traced = self.segment_traced = self.peak_traced = self.segment_peak_traced = _traced()
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    def sample(self, rss: int, traced: int):
+        with self.lock:
+            self.peak_rss = max(self.peak_rss, rss)
+            self.segment_peak_rss = max(self.segment_peak_rss, rss)
+            self.peak_traced = max(self.peak_traced, traced)
+            self.segment_peak_traced = max(self.segment_peak_traced, traced)
+
+    def mark(self, stage: str) -> dict:
+        rss, traced = _rss(), _traced()
+        self.sample(rss, traced)
+        with self.lock:
+            record = {
+                "rss_delta_mb": _mb(rss - self.segment_rss),
+                "rss_high_water_mb": _mb(self.segment_peak_rss - self.segment_rss),
+            }
+            if tracemalloc.is_tracing():
+                record["traced_delta_mb"] = _mb(traced - self.segment_traced)
+                record["traced_high_water_mb"] = _mb(self.segment_peak_traced - self.segment_traced)
+            self.stages[stage] = record
+            self.segment_rss = self.segment_peak_rss = rss
+            self.segment_traced = self.segment_peak_traced = traced
+        return record
+
+    def report(self) -> dict:
+        with self.lock:
+            report = {
+                "estimated_mb": round(self.estimate_mb, 2),
+                "rss_start_mb": _mb(self.start_rss),
+                "rss_high_water_mb": _mb(self.peak_rss - self.start_rss),
+                "stages": dict(self.stages),
+            }
+            if tracemalloc.is_tracing():
+                report["traced_high_water_mb"] = _mb(self.peak_traced - self.start_traced)
+        return report
+
+
+class MemorySampler:
+    """Daemon thread that feeds RSS / traced-memory samples to active requests."""
+
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self.active = set()
+        self.lock = threading.Lock()
+        self.worker_peak_rss = 0
+        self.thread = None
+
+    def track(self, request: RequestMemory):
+        with self.lock:
+            self.active.add(request)
+            if self.thread is None:
+                if TRACEMALLOC_ENABLED and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                self.thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+                self.thread.start()
+
+    def untrack(self, request: RequestMemory):
+        with self.lock:
+            self.active.discard(request)
+
+    def _run(self):
+        while True:
+            with self.lock:
+                active = list(self.active)
+            if active:
+                rss, traced = _rss(), _traced()
+                self.worker_peak_rss = max(self.worker_peak_rss, rss)
+                for request in active:
+                    request.sample(rss, traced)
+            time.sleep(self.interval_s)
+
+
+sampler = MemorySampler(SAMPLE_INTERVAL_S)
+
+
+# ----------------------------------------------------------
+# 2️⃣ Memory estimate from file type and size
+# ----------------------------------------------------------
+def estimate_request_mb(file) -> float:
+    """
+    Estimates a request's peak memory from the upload's type and size.
+    Images are sized from their pixel dimensions (header only, no decode).
+    """
+    file_name = file.filename.lower()
+    size = file.size
+    if size is None:
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+    file.file.seek(0)
+
+    extension = os.path.splitext(file_name)[1]
+    if extension in (".jpg", ".jpeg", ".png"):
+        try:
+            with Image.open(file.file) as image:
+                width, height = image.size
+            return BASE_REQUEST_MB + width * height * IMAGE_BYTES_PER_PIXEL / MB
+        except Exception:
+            return BASE_REQUEST_MB + size * 30 / MB
+        finally:
+            file.file.seek(0)
+
+    return BASE_REQUEST_MB + size * SIZE_MULTIPLIERS.get(extension, 4.0) / MB
+
+
+# ----------------------------------------------------------
+# 3️⃣ Admission control against the per-worker budget
+# ----------------------------------------------------------
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries the HTTP status."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AdmissionController:
+    """
+    Reserves estimated memory against a per-worker budget. Requests that
+    could never fit are rejected (413); requests that do not fit right now
+    wait in a bounded queue and are rejected (503) if the queue is full or
+    the wait times out.
+    """
+
+    def __init__(self, budget_mb: float, max_queue: int, queue_timeout_s: float):
+        self.budget_mb = budget_mb
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.reserved_mb = 0.0
+        self.waiting = 0
+        self.stats = {"admitted": 0, "queued": 0, "rejected_too_large": 0, "rejected_busy": 0}
+        self.condition = None
+
+    def _fits(self, need_mb: float) -> bool:
+        return self.reserved_mb + need_mb <= self.budget_mb
+
+    def check(self, need_mb: float):
+        """Fails fast for requests that can never be served right now."""
+        if need_mb > self.budget_mb:
+            self.stats["rejected_too_large"] += 1
+            raise AdmissionRejected(
+                413, f"⚠️ File needs ~{need_mb:.0f} MB, above the {self.budget_mb:.0f} MB worker budget."
+            )
+        if not self._fits(need_mb) and self.waiting >= self.max_queue:
+            self.stats["rejected_busy"] += 1
+            raise AdmissionRejected(503, "⚠️ Server is busy with large files. Please retry shortly.")
+
+    def must_wait(self, need_mb: float) -> bool:
+        return not self._fits(need_mb)
+
+    @asynccontextmanager
+    async def reserve(self, need_mb: float):
+        self.check(need_mb)
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+
+        async with self.condition:
+            if not self._fits(need_mb):
+                self.waiting += 1
+                self.stats["queued"] += 1
+                try:
+                    await asyncio.wait_for(
+                        self.condition.wait_for(lambda: self._fits(need_mb)), self.queue_timeout_s
+                    )
+                except asyncio.TimeoutError:
+                    self.stats["rejected_busy"] += 1
+                    raise AdmissionRejected(503, "⚠️ Timed out waiting for memory. Please retry shortly.")
+                finally:
+                    self.waiting -= 1
+            self.reserved_mb += need_mb
+            self.stats["admitted"] += 1
+
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self.reserved_mb -= need_mb
+                self.condition.notify_all()
+
+    def snapshot(self) -> dict:
+        return {
+            "budget_mb": self.budget_mb,
+            "reserved_mb": round(self.reserved_mb, 2),
+            "waiting": self.waiting,
+            "worker_rss_mb": _mb(_rss()),
+            "worker_peak_rss_mb": _mb(max(sampler.worker_peak_rss, _rss())),
+            **self.stats,
+        }
+
+
+admission = AdmissionController(WORKER_MEMORY_BUDGET_MB, ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT_S)
+
+
+@asynccontextmanager
+async def track_request_memory(estimate_mb: float):
+    """Registers a RequestMemory with the sampler for the duration of a request."""
+    request = RequestMemory(estimate_mb)
+    sampler.track(request)
+    try:
+        yield request
+    finally:
+        sampler.untrack(request)
+        report = request.report()
+        if report["rss_high_water_mb"] > estimate_mb:
+            print(f"⚠️ Request used {report['rss_high_water_mb']} MB RSS, above its {estimate_mb:.0f} MB estimate")
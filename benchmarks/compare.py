@@ -0,0 +1,76 @@
+# benchmarks/compare.py
+"""
+Compares two benchmark result files and flags regressions.
+
+    python -m benchmarks.compare baseline.json bench_results.json --threshold 0.10
+"""
+import argparse
+import json
+import sys
+
+# Metrics where bigger is worse, and the one where bigger is better
+LATENCY_METRICS = ["p50_ms", "p95_ms", "p99_ms"]
+THROUGHPUT_METRIC = "throughput_per_s"
+ERROR_METRIC = "error_rate"
+
+# Sub-millisecond stages are dominated by timer noise; ignore tiny absolute moves
+MIN_DELTA_MS = 0.5
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.10):
+    """
+    Returns one row per (stage, metric) present in both files. A row is a
+    regression when latency grows or throughput drops by more than
+    threshold, or when the error rate rises.
+    """
+    rows = []
+    for stage, old in baseline.get("stages", {}).items():
+        new = current.get("stages", {}).get(stage)
+        if new is None:
+            continue
+
+        for metric in LATENCY_METRICS:
+            before, after = old.get(metric, 0.0), new.get(metric, 0.0)
+            change = (after - before) / before if before else 0.0
+            regressed = change > threshold and after - before > MIN_DELTA_MS
+            rows.append({"stage": stage, "metric": metric, "baseline": before,
+                         "current": after, "change": change, "regressed": regressed})
+
+        before, after = old.get(THROUGHPUT_METRIC, 0.0), new.get(THROUGHPUT_METRIC, 0.0)
+        change = (after - before) / before if before else 0.0
+        rows.append({"stage": stage, "metric": THROUGHPUT_METRIC, "baseline": before,
+                     "current": after, "change": change, "regressed": change < -threshold})
+
+        before, after = old.get(ERROR_METRIC, 0.0), new.get(ERROR_METRIC, 0.0)
+        rows.append({"stage": stage, "metric": ERROR_METRIC, "baseline": before,
+                     "current": after, "change": after - before, "regressed": after > before})
+
+    return rows
+
+
+def print_comparison(rows):
+    print(f"\n{'Stage':<45} {'Metric':<18} {'Baseline':>12} {'Current':>12} {'Change':>9}")
+    for row in rows:
+        flag = "  ❌" if row["regressed"] else ""
+        print(f"{row['stage']:<45} {row['metric']:<18} {row['baseline']:>12.3f} "
+              f"{row['current']:>12.3f} {row['change']:>+8.1%}{flag}")
+
+    regressions = sum(row["regressed"] for row in rows)
+    print(f"\n{'❌' if regressions else '✅'} {regressions} regression(s) found.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline_results = json.load(handle)
+    with open(args.current, encoding="utf-8") as handle:
+        current_results = json.load(handle)
+
+    comparison = compare_results(baseline_results, current_results, args.threshold)
+    print_comparison(comparison)
+    sys.exit(1 if any(row["regressed"] for row in comparison) else 0)
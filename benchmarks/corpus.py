@@ -0,0 +1,159 @@
+# benchmarks/corpus.py
+import os
+import random
+
+import fitz  # PyMuPDF
+import pandas as pd
+from PIL import Image, ImageDraw
+
+# ==========================================================
+# 🔹 Corpus layout: (name, generator, size parameter)
+# ==========================================================
+TEXT_PDF_PAGES = [1, 10, 50]
+SCANNED_PDF_PAGES = [1, 5]
+STATEMENT_PDF_PAGES = [5, 100]
+RECEIPT_COUNT = 5
+LEDGER_ROWS = [100, 10_000, 100_000]
+
+VENDORS = ["Acme Corp", "Globex Ltd", "Initech", "Umbrella Supplies", "Stark Traders", "Wayne Retail"]
+NARRATIONS = ["UPI/PAYMENT", "NEFT/SALARY", "ATM WDL", "POS PURCHASE", "IMPS/TRANSFER", "CHQ DEPOSIT"]
+
+
+# ----------------------------------------------------------
+# Page content helpers
+# ----------------------------------------------------------
+def _invoice_lines(rng: random.Random, page_no: int):
+    vendor = rng.choice(VENDORS)
+    subtotal = round(rng.uniform(100, 10_000), 2)
+    tax = round(subtotal * 0.18, 2)
+    lines = [
+        f"INVOICE  #INV-{rng.randint(10000, 99999)}",
+        f"Vendor: {vendor}",
+        "Bill To: Example Customer Pvt Ltd",
+        f"Invoice Date: {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024",
+        f"Due Date: {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024",
+        "",
+    ]
+    for item in range(20):
+        lines.append(f"Item {page_no}-{item}   Qty {rng.randint(1, 9)}   {rng.uniform(5, 500):,.2f}")
+    lines += ["", f"Subtotal: {subtotal:,.2f}", f"GST 18%: {tax:,.2f}", f"Total Amount Due: {subtotal + tax:,.2f}"]
+    return lines
+
+
+def _write_text_pdf(path: str, pages: int, rng: random.Random):
+    with fitz.open() as pdf:
+        for page_no in range(pages):
+            page = pdf.new_page()
+            page.insert_text((50, 60), "\n".join(_invoice_lines(rng, page_no)), fontsize=10)
+        pdf.save(path, no_new_id=True)
+
+
+def _write_scanned_pdf(path: str, pages: int, rng: random.Random):
+    """
+    Renders text pages to bitmaps and re-embeds them as images, so the
+    PDF has no text layer — the same shape as a scanner output.
+    """
+    with fitz.open() as source, fitz.open() as scanned:
+        for page_no in range(pages):
+            page = source.new_page()
+            page.insert_text((50, 60), "\n".join(_invoice_lines(rng, page_no)), fontsize=10)
+            pixmap = page.get_pixmap(dpi=150)
+            target = scanned.new_page(width=page.rect.width, height=page.rect.height)
+            target.insert_image(target.rect, stream=pixmap.tobytes("png"))
+        scanned.save(path, no_new_id=True)
+
+
+def _write_statement_pdf(path: str, pages: int, rng: random.Random):
+    balance = 50_000.0
+    header = [(40, "Date"), (110, "Narration"), (300, "Chq No"), (370, "Debit"), (440, "Credit"), (510, "Balance")]
+
+    with fitz.open() as pdf:
+        for page_no in range(pages):
+            page = pdf.new_page()
+            page.insert_text((40, 40), "STATEMENT OF ACCOUNT   Account Number: 000123456789   IFSC: BANK0001234", fontsize=8)
+            for x, title in header:
+                page.insert_text((x, 60), title, fontsize=8)
+
+            y = 60
+            for row in range(50):
+                y += 14
+                amount = round(rng.uniform(10, 5_000), 2)
+                is_debit = rng.random() < 0.6
+                balance += -amount if is_debit else amount
+                day, month = row % 28 + 1, page_no * 12 // pages + 1
+                page.insert_text((40, y), f"{day:02d}/{month:02d}/2024", fontsize=8)
+                page.insert_text((110, y), f"{rng.choice(NARRATIONS)}/{rng.randint(1000, 9999)}", fontsize=8)
+                page.insert_text((370 if is_debit else 440, y), f"{amount:,.2f}", fontsize=8)
+                page.insert_text((505, y), f"{balance:,.2f}", fontsize=8)
+        pdf.save(path, no_new_id=True)
+
+
+def _write_receipt_image(path: str, rng: random.Random):
+    image = Image.new("RGB", (600, 800), "white")
+    draw = ImageDraw.Draw(image)
+    lines = [
+        "RECEIPT",
+        f"Store: {rng.choice(VENDORS)}",
+        f"Transaction ID: TXN{rng.randint(100000, 999999)}",
+        "Payment received - thank you for your purchase",
+    ]
+    total = 0.0
+    for item in range(10):
+        price = round(rng.uniform(1, 200), 2)
+        total += price
+        lines.append(f"Item {item}    {price:.2f}")
+    lines += [f"TOTAL  {total:.2f}", "Paid by: CARD"]
+
+    for line_no, line in enumerate(lines):
+        draw.text((40, 40 + line_no * 30), line, fill="black")
+    image.save(path)
+
+
+def _ledger_frame(rows: int, rng: random.Random) -> pd.DataFrame:
+    return pd.DataFrame({
+        "date": [f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" for _ in range(rows)],
+        "vendor": [rng.choice(VENDORS) for _ in range(rows)],
+        "invoice_number": [f"INV-{i:07d}" for i in range(rows)],
+        "amount": [round(rng.uniform(1, 10_000), 2) for _ in range(rows)],
+        "tax": [round(rng.uniform(0, 1_800), 2) for _ in range(rows)],
+    })
+
+
+# ==========================================================
+# 🔹 Public entry point
+# ==========================================================
+def generate_corpus(output_dir: str, seed: int = 42, include_large: bool = True):
+    """
+    Writes a deterministic synthetic corpus into output_dir and returns
+    a list of {"path", "kind", "size"} entries. The same seed always
+    produces the same documents.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    corpus = []
+
+    def add(name, kind, size, writer):
+        path = os.path.join(output_dir, name)
+        writer(path)
+        corpus.append({"path": path, "kind": kind, "size": size})
+
+    for pages in TEXT_PDF_PAGES:
+        add(f"invoice_{pages}p.pdf", "text_pdf", pages, lambda p, n=pages: _write_text_pdf(p, n, rng))
+
+    for pages in SCANNED_PDF_PAGES:
+        add(f"scanned_{pages}p.pdf", "scanned_pdf", pages, lambda p, n=pages: _write_scanned_pdf(p, n, rng))
+
+    for pages in STATEMENT_PDF_PAGES:
+        add(f"statement_{pages}p.pdf", "statement_pdf", pages, lambda p, n=pages: _write_statement_pdf(p, n, rng))
+
+    for index in range(RECEIPT_COUNT):
+        add(f"receipt_{index}.png", "receipt_image", 1, lambda p: _write_receipt_image(p, rng))
+
+    for rows in LEDGER_ROWS:
+        if rows > 10_000 and not include_large:
+            continue
+        frame = _ledger_frame(rows, rng)
+        add(f"ledger_{rows}.csv", "csv", rows, lambda p, f=frame: f.to_csv(p, index=False))
+        add(f"ledger_{rows}.xlsx", "xlsx", rows, lambda p, f=frame: f.to_excel(p, index=False))
+
+    return corpus
@@ -0,0 +1,300 @@
+# benchmarks/run_benchmarks.py
+"""
+End-to-end benchmark for the document pipeline.
+
+Generates a deterministic synthetic corpus, points the Gemini client at a
+local stub server and measures latency percentiles and throughput for every
+pipeline stage and for the /analyze/ endpoint under concurrent load.
+
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.compare import compare_results, print_comparison
+from benchmarks.corpus import generate_corpus
+from benchmarks.stub_gemini import start_stub_server
+
+# /analyze/ load mix: every text, scanned and statement PDF, all receipts
+# and the 100 / 10k-row ledgers. "size" is pages for PDFs, rows for ledgers
+# and 1 for receipts; the 100k-row ledgers only run in the stage benchmarks.
+ENDPOINT_MAX_SIZE = {
+    "text_pdf": 50,
+    "scanned_pdf": 5,
+    "statement_pdf": 100,
+    "receipt_image": 1,
+    "csv": 10_000,
+    "xlsx": 10_000,
+}
+
+MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".png": "image/png",
+    ".csv": "text/csv",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+# ----------------------------------------------------------
+# Statistics helpers
+# ----------------------------------------------------------
+def _percentile(sorted_values, q):
+    """Nearest-rank percentile: the smallest value with at least q% at or below it."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize_timings(latencies, errors, wall_time):
+    """
+    Turns raw per-call latencies (seconds) into the stage record stored
+    in the results file.
+    """
+    values = sorted(latencies)
+    count = len(values)
+    to_ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "count": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "throughput_per_s": round(count / wall_time, 3) if wall_time > 0 else 0.0,
+        "mean_ms": to_ms(sum(values) / count) if count else 0.0,
+        "p50_ms": to_ms(_percentile(values, 50)),
+        "p90_ms": to_ms(_percentile(values, 90)),
+        "p95_ms": to_ms(_percentile(values, 95)),
+        "p99_ms": to_ms(_percentile(values, 99)),
+        "max_ms": to_ms(values[-1]) if values else 0.0,
+    }
+
+
+def time_calls(fn, inputs, is_error=lambda result: False):
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for item in inputs:
+        call_start = time.perf_counter()
+        result = fn(item)
+        latencies.append(time.perf_counter() - call_start)
+        errors += bool(is_error(result))
+    return summarize_timings(latencies, errors, time.perf_counter() - started)
+
+
+class _BenchUpload:
+    """Just enough of UploadFile for extract_text_from_pdf."""
+
+    def __init__(self, path):
+        self.filename = os.path.basename(path)
+        self._path = path
+
+    def read(self):
+        with open(self._path, "rb") as handle:
+            return handle.read()
+
+
+def _gemini_failed(result):
+    return isinstance(result, dict) and bool(result.get("degraded"))
+
+
+# ----------------------------------------------------------
+# Stage benchmarks
+# ----------------------------------------------------------
+def bench_stages(corpus, repeat, gemini_calls):
+    from api.services.classification_service import classify_text
+    from api.services.gemini_service import summarize_with_gemini, analyze_tabular_data_with_gemini
+    from api.services.ocr_service import extract_text_from_pdf
+    from api.services.statement_service import extract_statement_table, summarize_statement
+    import pandas as pd
+
+    stages, texts = {}, []
+    documents = [doc for doc in corpus if doc["kind"] in ("text_pdf", "scanned_pdf", "statement_pdf", "receipt_image")]
+
+    for kind in sorted({doc["kind"] for doc in documents}):
+        paths = [doc["path"] for doc in documents if doc["kind"] == kind] * repeat
+
+        def run_ocr(path):
+            text = asyncio.run(extract_text_from_pdf(_BenchUpload(path)))
+            texts.append(text)
+            return text
+
+        stages[f"extract_text_from_pdf[{kind}]"] = time_calls(
+            run_ocr, paths, is_error=lambda text: text.startswith("⚠️")
+        )
+        print(f"  ✅ extract_text_from_pdf[{kind}]")
+
+    readable = [text for text in texts if not text.startswith("⚠️")] or ["empty"]
+    stages["classify_text"] = time_calls(classify_text, readable * max(1, 200 // len(readable)))
+    print("  ✅ classify_text")
+
+    statements = [doc["path"] for doc in corpus if doc["kind"] == "statement_pdf"]
+    for path in statements:
+        with open(path, "rb") as handle:
+            pdf_bytes = handle.read()
+        name = os.path.splitext(os.path.basename(path))[0]
+        stages[f"extract_statement_table[{name}]"] = time_calls(
+            lambda data: summarize_statement(extract_statement_table(data)), [pdf_bytes] * repeat
+        )
+    print("  ✅ extract_statement_table")
+
+    prompts = (readable * gemini_calls)[:gemini_calls]
+    stages["summarize_with_gemini"] = time_calls(
+        lambda text: asyncio.run(summarize_with_gemini(text, "Invoice")), prompts, is_error=_gemini_failed
+    )
+    print("  ✅ summarize_with_gemini")
+
+    ledgers = [doc for doc in corpus if doc["kind"] == "csv"]
+    frames = [pd.read_csv(doc["path"]) for doc in ledgers]
+    stages["analyze_tabular_data_with_gemini"] = time_calls(
+        lambda df: asyncio.run(analyze_tabular_data_with_gemini(df)),
+        (frames * gemini_calls)[:gemini_calls],
+        is_error=_gemini_failed,
+    )
+    print("  ✅ analyze_tabular_data_with_gemini")
+
+    return stages
+
+
+# ----------------------------------------------------------
+# Endpoint benchmark (/analyze/ under concurrent load)
+# ----------------------------------------------------------
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_api():
+    import uvicorn
+    from api.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=_free_port(), log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{server.config.port}/analyze/"
+
+
+def bench_endpoint(corpus, concurrency_levels, requests_per_level):
+    import requests
+
+    server, url = _start_api()
+    payloads = []
+    for doc in corpus:
+        if doc["size"] > ENDPOINT_MAX_SIZE.get(doc["kind"], 0):
+            continue
+        with open(doc["path"], "rb") as handle:
+            extension = os.path.splitext(doc["path"])[1]
+            payloads.append((os.path.basename(doc["path"]), handle.read(), MIME_TYPES[extension]))
+
+    stages = {}
+    try:
+        for concurrency in concurrency_levels:
+            jobs = (payloads * requests_per_level)[:requests_per_level]
+
+            def post(payload):
+                call_start = time.perf_counter()
+                try:
+                    response = requests.post(url, files={"file": payload}, timeout=300)
+                    failed = response.status_code != 200 or bool(response.json().get("degraded"))
+                except (requests.RequestException, ValueError):
+                    failed = True
+                return time.perf_counter() - call_start, failed
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                outcomes = list(pool.map(post, jobs))
+            wall_time = time.perf_counter() - started
+
+            stages[f"analyze_endpoint[c={concurrency}]"] = summarize_timings(
+                [latency for latency, _ in outcomes], sum(failed for _, failed in outcomes), wall_time
+            )
+            print(f"  ✅ /analyze/ at concurrency {concurrency}")
+    finally:
+        server.should_exit = True
+
+    return stages
+
+
+# ==========================================================
+# 🔹 CLI
+# ==========================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the financial document pipeline.")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results.")
+    parser.add_argument("--corpus-dir", default=None, help="Keep the generated corpus here (default: temp dir).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus for local stages.")
+    parser.add_argument("--gemini-calls", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Stub Gemini mean latency.")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub calls that fail.")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated load levels for /analyze/.")
+    parser.add_argument("--requests", type=int, default=48, help="Requests per concurrency level.")
+    parser.add_argument("--quick", action="store_true", help="Skip the largest ledgers and the endpoint run.")
+    parser.add_argument("--baseline", default=None, help="Compare against this results file.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed regression ratio (0.10 = 10%%).")
+    args = parser.parse_args(argv)
+
+    stub = start_stub_server(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                             error_rate=args.error_rate, seed=args.seed)
+    # Must be set before api.services.gemini_service builds its client
+    os.environ["GEMINI_BASE_URL"] = stub.base_url
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub-key")
+    # Stub answers are canned ("Invoice" for everything); keep them out of the
+    # classifier training log. Set before load_dotenv() can pull it from .env
+    os.environ["CLASSIFIER_TRAINING_LOG"] = ""
+
+    from api.services.gemini_service import get_gemini_status
+
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix="fin_bench_")
+    print(f"🧪 Generating corpus in {corpus_dir} (seed={args.seed})")
+    corpus = generate_corpus(corpus_dir, seed=args.seed, include_large=not args.quick)
+
+    print("⏱️  Benchmarking pipeline stages")
+    stages = bench_stages(corpus, args.repeat, args.gemini_calls)
+
+    if not args.quick:
+        print("⏱️  Benchmarking /analyze/ endpoint")
+        levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+        stages.update(bench_endpoint(corpus, levels, args.requests))
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+            "stub_calls": stub.calls,
+            "stub_errors": stub.errors,
+            "gemini_status": get_gemini_status(),
+        },
+        "stages": stages,
+    }
+    stub.shutdown()
+
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2)
+    print(f"\n📊 Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        rows = compare_results(baseline, results, args.threshold)
+        print_comparison(rows)
+        return 1 if any(row["regressed"] for row in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
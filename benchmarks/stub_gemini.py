@@ -0,0 +1,126 @@
+# benchmarks/stub_gemini.py
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==========================================================
+# 🔹 Canned model output (covers document + tabular schemas)
+# ==========================================================
+STUB_ANSWER = {
+    "summary": "Synthetic benchmark response.",
+    "confirmed_label": "Invoice",
+    "invoice_number": "INV-00001",
+    "total_amount": "1180.00",
+    "invoice_date": "01/01/2024",
+    "due_date": "31/01/2024",
+    "vendor_name": "Acme Corp",
+    "tax_rate": "18%",
+    "tax_amount": "180.00",
+    "subtotal": "1000.00",
+    "dataset_type": "transactions",
+    "top_vendors": ["Acme Corp"],
+    "average_transaction": "500.00",
+    "insights": "None.",
+}
+
+
+class StubGeminiServer(ThreadingHTTPServer):
+    """
+    Minimal stand-in for the Gemini generateContent endpoint.
+    Latency is latency_ms ± jitter_ms; error_rate is the fraction of
+    calls answered with HTTP 503. Randomness is seeded for repeatability.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=200.0, jitter_ms=50.0, error_rate=0.0, seed=42):
+        super().__init__(address, _StubHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def next_outcome(self):
+        with self.lock:
+            self.calls += 1
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            failed = self.rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        return delay, failed
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+
+        delay, failed = self.server.next_outcome()
+        time.sleep(delay)
+
+        if failed:
+            status, body = 503, {"error": {"code": 503, "message": "Stub overloaded", "status": "UNAVAILABLE"}}
+        elif ":generateContent" not in self.path:
+            status, body = 404, {"error": {"code": 404, "message": "Unknown method", "status": "NOT_FOUND"}}
+        else:
+            status, body = 200, {
+                "candidates": [{
+                    "content": {"role": "model", "parts": [{"text": json.dumps(STUB_ANSWER)}]},
+                    "finishReason": "STOP",
+                }],
+                "usageMetadata": {"promptTokenCount": length // 4, "candidatesTokenCount": 120},
+            }
+
+        payload = json.dumps(body).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up (deadline / losing hedge)
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+
+def start_stub_server(port=0, **options):
+    """
+    Starts the stub in a daemon thread and returns the server.
+    port=0 picks a free port; read it back from server.base_url.
+    """
+    server = StubGeminiServer(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stub Gemini server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    stub = StubGeminiServer(
+        ("127.0.0.1", args.port),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    print(f"🧪 Stub Gemini listening on {stub.base_url}")
+    stub.serve_forever()
@@ -0,0 +1,45 @@
+# tests/test_classifier_model.py
+import numpy as np
+import pytest
+
+from api.services.classifier_model import LinearDocClassifier, train_classifier, vectorize
+
+DOCS = [
+    "Bank statement opening balance 1,000.00 salary credit",
+    "Receipt thank you for shopping, total paid 12.50",
+    "Tax invoice INV-001 amount due 1,180.00 by 31/01/2024",
+]
+
+
+def test_batch_rows_match_single_documents():
+    batch = vectorize(DOCS)
+
+    for i, text in enumerate(DOCS):
+        assert abs(batch[i] - vectorize([text])).max() == 0
+    np.testing.assert_allclose(batch.multiply(batch).sum(axis=1).A1, 1.0, rtol=1e-6)
+
+
+def test_empty_documents_have_no_features():
+    assert vectorize([]).shape[0] == 0
+    assert vectorize(["", None, "⚠️ —"]).nnz == 0
+
+
+def test_saved_model_round_trips(tmp_path):
+    labels = ["Bank Statement", "Receipt", "Invoice"]
+    model, _ = train_classifier(DOCS * 3, labels * 3)
+    path = str(tmp_path / "model.npz")
+    model.save(path)
+
+    loaded = LinearDocClassifier.load(path)
+
+    assert loaded.predict(DOCS) == model.predict(DOCS)
+    assert [label for label, _ in loaded.predict(DOCS)] == labels
+
+
+def test_model_from_older_feature_hashing_is_rejected(tmp_path):
+    path = str(tmp_path / "old.npz")
+    np.savez(path, labels=np.array(["A", "B"]), rows=np.array([0], dtype=np.int32),
+             weights=np.zeros((1, 2), dtype=np.float32), bias=np.zeros(2), temperature=1.0)
+
+    with pytest.raises(ValueError, match="retrain"):
+        LinearDocClassifier.load(path)
@@ -0,0 +1,151 @@
+# tests/test_memory.py
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+from starlette.datastructures import UploadFile
+
+from api.utils.memory import (
+    BASE_REQUEST_MB,
+    IMAGE_BYTES_PER_PIXEL,
+    MB,
+    SIZE_MULTIPLIERS,
+    AdmissionController,
+    AdmissionRejected,
+    estimate_request_mb,
+)
+
+
+def _controller(budget_mb=100, max_queue=4, queue_timeout_s=1.0):
+    return AdmissionController(budget_mb, max_queue, queue_timeout_s)
+
+
+async def _hold(admission, need_mb, seconds=0.0):
+    async with admission.reserve(need_mb):
+        await asyncio.sleep(seconds)
+
+
+# ----------------------------------------------------------
+# Admission control
+# ----------------------------------------------------------
+def test_request_over_budget_is_rejected_with_413():
+    admission = _controller()
+
+    async def run():
+        async with admission.reserve(150):
+            pass
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        asyncio.run(run())
+
+    assert rejected.value.status_code == 413
+    assert admission.stats["rejected_too_large"] == 1
+    assert admission.reserved_mb == 0
+
+
+def test_full_queue_is_rejected_with_503():
+    admission = _controller(max_queue=1)
+
+    async def run():
+        async with admission.reserve(80):
+            waiter = asyncio.create_task(_hold(admission, 50))
+            await asyncio.sleep(0.01)
+            assert admission.waiting == 1
+            try:
+                await _hold(admission, 50)
+            finally:
+                waiter.cancel()
+                await asyncio.gather(waiter, return_exceptions=True)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        asyncio.run(run())
+
+    assert rejected.value.status_code == 503
+    assert admission.stats["rejected_busy"] == 1
+    assert admission.waiting == 0
+    assert admission.reserved_mb == 0
+
+
+def test_queue_wait_times_out_with_503():
+    admission = _controller(queue_timeout_s=0.05)
+
+    async def run():
+        async with admission.reserve(80):
+            async with admission.reserve(50):
+                pass
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        asyncio.run(run())
+
+    assert rejected.value.status_code == 503
+    assert admission.waiting == 0
+    assert admission.reserved_mb == 0
+
+
+def test_queued_request_is_admitted_after_release():
+    admission = _controller()
+    order = []
+
+    async def hold(name, need_mb, seconds):
+        async with admission.reserve(need_mb):
+            order.append(f"{name} in")
+            await asyncio.sleep(seconds)
+        order.append(f"{name} out")
+
+    async def run():
+        first = asyncio.create_task(hold("first", 80, 0.05))
+        await asyncio.sleep(0.01)
+        assert admission.must_wait(50)
+        await asyncio.gather(first, hold("second", 50, 0))
+
+    asyncio.run(run())
+
+    assert order == ["first in", "first out", "second in", "second out"]
+    assert admission.stats["queued"] == 1
+    assert admission.stats["admitted"] == 2
+    assert admission.reserved_mb == 0
+
+
+def test_reservation_is_returned_after_an_error():
+    admission = _controller()
+
+    async def run():
+        async with admission.reserve(60):
+            assert admission.reserved_mb == 60
+            raise ValueError("pipeline failed")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+    assert admission.reserved_mb == 0
+
+
+# ----------------------------------------------------------
+# Memory estimate
+# ----------------------------------------------------------
+def _upload(name, data):
+    return UploadFile(file=io.BytesIO(data), filename=name, size=len(data))
+
+
+def test_image_estimate_uses_pixel_dimensions_and_rewinds():
+    buffer = io.BytesIO()
+    Image.new("RGB", (2000, 1000), "white").save(buffer, format="PNG")
+    upload = _upload("receipt.png", buffer.getvalue())
+
+    estimate = estimate_request_mb(upload)
+
+    assert estimate == pytest.approx(BASE_REQUEST_MB + 2000 * 1000 * IMAGE_BYTES_PER_PIXEL / MB)
+    assert upload.file.tell() == 0
+    assert upload.file.read() == buffer.getvalue()
+
+
+def test_estimate_scales_with_size_and_type():
+    data = b"a,b\n" + b"1,2\n" * 50_000
+    upload = _upload("ledger.csv", data)
+    upload.size = None
+
+    estimate = estimate_request_mb(upload)
+
+    assert estimate == pytest.approx(BASE_REQUEST_MB + len(data) * SIZE_MULTIPLIERS[".csv"] / MB)
+    assert upload.file.tell() == 0
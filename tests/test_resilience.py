@@ -0,0 +1,181 @@
+# tests/test_resilience.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from api.services.resilience import CircuitBreaker, CircuitOpen, DeadlineExceeded, HedgedCaller
+
+
+def _breaker(**options):
+    settings = {"failure_rate": 0.5, "window": 4, "min_calls": 2, "cooldown_s": 0.05}
+    return CircuitBreaker(**{**settings, **options})
+
+
+def _call(caller, fn, budget_s):
+    return asyncio.run(caller.call(fn, time.monotonic() + budget_s))
+
+
+def _sleeper(seconds, result="ok"):
+    def fn(timeout_s):
+        time.sleep(seconds)
+        return result
+    return fn
+
+
+def _failing(timeout_s):
+    raise RuntimeError("provider down")
+
+
+# ----------------------------------------------------------
+# Circuit breaker
+# ----------------------------------------------------------
+def test_breaker_opens_probes_and_closes():
+    breaker = _breaker()
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # one probe at a time
+
+    breaker.record(True)
+    assert breaker.state == "closed"
+    assert breaker.snapshot()["recent_failure_rate"] == 0.0
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = _breaker()
+    breaker.record(False)
+    breaker.record(False)
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    breaker.record(False)
+
+    assert breaker.state == "open"
+    assert breaker.trips == 2
+    assert not breaker.allow()
+
+
+def test_release_frees_probe_on_spent_budget():
+    breaker = _breaker()
+    breaker.record(False)
+    breaker.record(False)
+    time.sleep(0.06)
+    caller = HedgedCaller(breaker)
+
+    with pytest.raises(DeadlineExceeded):
+        _call(caller, _sleeper(0), -1)
+
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert caller.stats["skipped_no_budget"] == 1
+
+
+# ----------------------------------------------------------
+# Hedged calls
+# ----------------------------------------------------------
+def test_spent_budgets_never_trip_the_breaker():
+    caller = HedgedCaller(_breaker())
+    for _ in range(10):
+        with pytest.raises(DeadlineExceeded):
+            _call(caller, _sleeper(0), -1)
+
+    assert caller.breaker.state == "closed"
+    assert caller.stats["calls"] == 0
+
+
+def test_timeouts_under_min_attempt_do_not_count():
+    caller = HedgedCaller(_breaker(), default_hedge_delay_s=1.0, min_attempt_s=0.5)
+    for _ in range(3):
+        with pytest.raises(DeadlineExceeded):
+            _call(caller, _sleeper(0.3), 0.05)
+
+    assert caller.breaker.state == "closed"
+    assert caller.stats["timeouts"] == 3
+
+
+def test_timeouts_with_fair_budget_trip_the_breaker():
+    caller = HedgedCaller(_breaker(), default_hedge_delay_s=1.0, min_attempt_s=0.01)
+    for _ in range(2):
+        with pytest.raises(DeadlineExceeded):
+            _call(caller, _sleeper(0.3), 0.05)
+
+    assert caller.breaker.state == "open"
+
+
+def test_errors_count_against_the_breaker():
+    caller = HedgedCaller(_breaker())
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="provider down"):
+            _call(caller, _failing, 1.0)
+
+    assert caller.breaker.state == "open"
+    assert caller.stats["errors"] == 2
+
+
+def test_hedge_fires_after_delay_and_wins():
+    calls = []
+    lock = threading.Lock()
+
+    def fn(timeout_s):
+        with lock:
+            calls.append(time.monotonic())
+            first = len(calls) == 1
+        time.sleep(0.5 if first else 0.01)
+        return "primary" if first else "hedge"
+
+    caller = HedgedCaller(_breaker(), default_hedge_delay_s=0.05)
+    started = time.monotonic()
+
+    assert _call(caller, fn, 2.0) == "hedge"
+    assert len(calls) == 2
+    assert calls[1] - started >= 0.05
+    assert caller.stats["hedged"] == 1
+    assert caller.stats["hedge_wins"] == 1
+
+
+def test_fast_call_is_not_hedged():
+    caller = HedgedCaller(_breaker(), default_hedge_delay_s=0.2)
+
+    assert _call(caller, _sleeper(0.01), 1.0) == "ok"
+    assert caller.stats["hedged"] == 0
+    assert caller.latency.percentile(95, min_samples=1) is not None
+
+
+def test_open_breaker_skips_the_call():
+    caller = HedgedCaller(_breaker(cooldown_s=60))
+    caller.breaker.record(False)
+    caller.breaker.record(False)
+    calls = []
+
+    with pytest.raises(CircuitOpen):
+        _call(caller, calls.append, 1.0)
+
+    assert calls == []
+    assert caller.breaker.snapshot()["rejected_calls"] == 1
+
+
+def test_cancelled_probe_is_released():
+    breaker = _breaker()
+    breaker.record(False)
+    breaker.record(False)
+    time.sleep(0.06)
+    caller = HedgedCaller(breaker, default_hedge_delay_s=1.0)
+
+    async def cancel_midway():
+        task = asyncio.create_task(caller.call(_sleeper(0.3), time.monotonic() + 1.0))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_midway())
+
+    assert breaker.state == "half_open"
+    assert breaker.allow()
@@ -0,0 +1,178 @@
+# tests/test_statement_service.py
+import fitz  # PyMuPDF
+import numpy as np
+
+from api.services.statement_service import (
+    _parse_amount,
+    check_running_balance,
+    extract_statement_table,
+    summarize_statement,
+)
+
+HEADER = [(40, "Date"), (110, "Narration"), (300, "Debit"), (370, "Credit"), (440, "Balance")]
+COLUMN_X = {"date": 40, "narration": 110, "debit": 300, "credit": 370, "balance": 435}
+ROW_HEIGHT = 14
+
+
+def _statement_pdf(pages):
+    """
+    Builds a statement PDF. Each page is a list of rows; a row is a dict of
+    column -> text, or ("text", x, y) tuples for free text (letterheads,
+    footers). Rows are laid out one line apart below the header.
+    """
+    with fitz.open() as pdf:
+        for page_rows in pages:
+            page = pdf.new_page()
+            y = 60
+            for row in page_rows:
+                if isinstance(row, tuple):
+                    text, x, free_y = row
+                    page.insert_text((x, free_y), text, fontsize=8)
+                    continue
+                if row == "header":
+                    y += ROW_HEIGHT
+                    for x, title in HEADER:
+                        page.insert_text((x, y), title, fontsize=8)
+                    continue
+                y += ROW_HEIGHT
+                for column, text in row.items():
+                    page.insert_text((COLUMN_X[column], y), text, fontsize=8)
+        return pdf.tobytes()
+
+
+def test_parse_amount_formats():
+    assert _parse_amount("1,234.56") == 1234.56
+    assert _parse_amount("(50.00)") == -50.0
+    assert _parse_amount("9,870.00 Dr") == -9870.0
+    assert _parse_amount("9,870.00 Cr") == 9870.0
+    assert _parse_amount("-") == 0.0
+    assert np.isnan(_parse_amount("", blank=np.nan))
+    assert _parse_amount("UPI") is None
+
+
+def test_extracts_columns_and_opening_balance():
+    pdf = _statement_pdf([[
+        "header",
+        {"narration": "Opening Balance", "balance": "1,000.00"},
+        {"date": "01/04/2024", "narration": "SALARY", "credit": "2,000.00", "balance": "3,000.00"},
+        {"date": "02/04/2024", "narration": "RENT", "debit": "1,500.00", "balance": "1,500.00 Cr"},
+    ]])
+
+    table = extract_statement_table(pdf)
+
+    assert table["opening_balance"] == 1000.0
+    assert list(table["date"].astype(str)) == ["2024-04-01", "2024-04-02"]
+    assert list(table["narration"]) == ["SALARY", "RENT"]
+    np.testing.assert_allclose(table["debit"], [0.0, 1500.0])
+    np.testing.assert_allclose(table["credit"], [2000.0, 0.0])
+    np.testing.assert_allclose(table["balance"], [3000.0, 1500.0])
+    assert check_running_balance(table).all()
+
+
+def test_newest_first_statement_is_reversed():
+    pdf = _statement_pdf([[
+        "header",
+        {"date": "03/04/2024", "narration": "ATM", "debit": "100.00", "balance": "800.00"},
+        {"date": "02/04/2024", "narration": "POS", "debit": "100.00", "balance": "900.00"},
+        {"date": "01/04/2024", "narration": "NEFT", "credit": "1,000.00", "balance": "1,000.00"},
+    ]])
+
+    table = extract_statement_table(pdf)
+
+    assert list(table["narration"]) == ["NEFT", "POS", "ATM"]
+    assert check_running_balance(table).all()
+
+
+def test_wrapped_narration_is_joined():
+    pdf = _statement_pdf([[
+        "header",
+        {"date": "01/04/2024", "narration": "UPI/PAYMENT/1234", "debit": "50.00", "balance": "950.00"},
+        {"narration": "GROCERY STORE"},
+        {"date": "02/04/2024", "narration": "ATM", "debit": "50.00", "balance": "900.00"},
+    ]])
+
+    table = extract_statement_table(pdf)
+
+    assert list(table["narration"]) == ["UPI/PAYMENT/1234 GROCERY STORE", "ATM"]
+
+
+def test_letterhead_and_footer_do_not_leak_into_narration():
+    letterhead = ("STATEMENT OF ACCOUNT Account Number: 000123", 40, 40)
+    footer = ("This is a computer generated statement", 110, 700)
+    pdf = _statement_pdf([
+        [letterhead, "header",
+         {"date": "01/04/2024", "narration": "SALARY", "credit": "1,000.00", "balance": "1,000.00"},
+         footer],
+        [letterhead, "header",
+         {"date": "02/04/2024", "narration": "RENT", "debit": "400.00", "balance": "600.00"},
+         footer],
+    ])
+
+    table = extract_statement_table(pdf)
+
+    assert list(table["narration"]) == ["SALARY", "RENT"]
+
+
+def test_blank_balance_is_carried_forward():
+    pdf = _statement_pdf([[
+        "header",
+        {"date": "01/04/2024", "narration": "SALARY", "credit": "1,000.00", "balance": "900.00"},
+        {"date": "02/04/2024", "narration": "REFUND", "credit": "500.00"},
+        {"date": "02/04/2024", "narration": "BONUS", "credit": "450.00", "balance": "1,850.00"},
+    ]])
+
+    table = extract_statement_table(pdf)
+    summary = summarize_statement(table)
+
+    assert np.isnan(table["balance"][1])
+    assert check_running_balance(table).all()
+    assert summary["min_balance"] == 900.0
+    assert summary["closing_balance"] == 1850.0
+    assert summary["balance_check_passed"] is True
+    assert summary["balance_mismatch_rows"] == []
+
+
+def test_running_balance_mismatch_is_reported():
+    pdf = _statement_pdf([[
+        "header",
+        {"date": "01/04/2024", "narration": "SALARY", "credit": "1,000.00", "balance": "1,000.00"},
+        {"date": "02/04/2024", "narration": "RENT", "debit": "400.00", "balance": "700.00"},
+    ]])
+
+    summary = summarize_statement(extract_statement_table(pdf))
+
+    assert summary["balance_check_passed"] is False
+    assert summary["balance_mismatch_rows"] == [1]
+
+
+def test_largest_credit_is_none_without_credits():
+    pdf = _statement_pdf([[
+        "header",
+        {"narration": "Opening Balance", "balance": "1,000.00"},
+        {"date": "01/04/2024", "narration": "ATM", "debit": "100.00", "balance": "900.00"},
+        {"date": "02/04/2024", "narration": "RENT", "debit": "400.00", "balance": "500.00"},
+    ]])
+
+    summary = summarize_statement(extract_statement_table(pdf))
+
+    assert summary["largest_credit"] is None
+    assert summary["largest_debit"]["narration"] == "RENT"
+    assert summary["largest_debit"]["amount"] == 400.0
+
+
+def test_header_on_first_page_only_keeps_later_pages():
+    letterhead = ("STATEMENT OF ACCOUNT Account Number: 000123", 40, 40)
+    pdf = _statement_pdf([
+        [letterhead, "header",
+         {"narration": "Opening Balance", "balance": "1,000.00"},
+         {"date": "01/04/2024", "narration": "SALARY", "credit": "500.00", "balance": "1,500.00"}],
+        [letterhead,
+         {"date": "02/04/2024", "narration": "RENT", "debit": "1,000.00", "balance": "500.00"}],
+    ])
+
+    summary = summarize_statement(extract_statement_table(pdf))
+
+    assert summary["transaction_count"] == 2
+    assert summary["total_debits"] == 1000.0
+    assert summary["closing_balance"] == 500.0
+    assert summary["balance_check_passed"] is True
@@ -0,0 +1,51 @@
+import argparse
+import json
+
+import pandas as pd
+
+from api.services.classification_service import KEYWORDS
+from api.services.classifier_model import MODEL_PATH, train_classifier
+
+# ✅ Map Gemini's free-form labels onto the known label set
+KNOWN_LABELS = {label.lower(): label for label in KEYWORDS}
+
+
+def load_pairs(path):
+    """
+    Reads (text, confirmed_label) pairs from a JSONL training log
+    or a CSV with 'text' and 'confirmed_label' columns.
+    """
+    if path.endswith(".csv"):
+        records = pd.read_csv(path).to_dict("records")
+    else:
+        with open(path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    texts, labels = [], []
+    for record in records:
+        label = KNOWN_LABELS.get(str(record.get("confirmed_label", "")).strip().lower())
+        if label and isinstance(record.get("text"), str):
+            texts.append(record["text"])
+            labels.append(label)
+    return texts, labels
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the hashed n-gram document classifier.")
+    parser.add_argument("pairs", help="JSONL training log or CSV of (text, confirmed_label).")
+    parser.add_argument("--output", default=MODEL_PATH)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    texts, labels = load_pairs(args.pairs)
+    print(f"🧾 Loaded {len(texts)} labelled documents from {args.pairs}")
+
+    model, report = train_classifier(texts, labels, l2=args.l2)
+    model.save(args.output)
+
+    print(f"📊 Training report: {json.dumps(report, indent=2)}")
+    if not report["calibrated"]:
+        print("⚠️ Fewer than 20 samples: no holdout, probabilities are not calibrated.")
+    elif report["temperature_at_range_edge"]:
+        print("⚠️ Temperature hit the search range edge; collect more varied data before trusting confidences.")
+    print(f"✅ Model saved to {args.output}")
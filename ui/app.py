@@ -3,6 +3,7 @@ import streamlit as st
 import pandas as pd
 import requests
 import time
+import json
 import warnings
 
 # Suppress Streamlit future warnings
@@ -75,6 +76,73 @@ st.markdown("""
 # 🔹 BACKEND CONFIGURATION
 # =============================================================
 BACKEND_URL = "http://127.0.0.1:8000/analyze/"
+STREAM_URL = "http://127.0.0.1:8000/analyze/stream"
+
+STAGE_TITLES = {
+    "ocr": "📄 Text extracted",
+    "parsed": "📑 Table parsed",
+    "classification": "🧾 Classified",
+    "statement": "🏦 Statement analysed",
+    "gemini": "🤖 Gemini insights",
+}
+
+
+def iter_sse(response):
+    """Yields (event, data) pairs from a Server-Sent Events response."""
+    event, data = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+        elif not line and event:
+            yield event, json.loads("\n".join(data))
+            event, data = None, []
+
+
+def describe_stage(event, data):
+    if event == "queued":
+        return f"⏳ Queued — needs ~{data['estimated_mb']:.0f} MB, {data['reserved_mb']:.0f}/{data['budget_mb']:.0f} MB in use"
+
+    timing = f"`{data.get('stage_s', 0):.2f}s` (total `{data.get('elapsed_s', 0):.2f}s`)"
+    if "memory" in data:
+        timing += f" · `{data['memory']['rss_high_water_mb']:+.1f} MB`"
+    if event == "ocr":
+        return f"{STAGE_TITLES[event]} — {data['pages']} page(s), {data['characters']} chars · {timing}"
+    if event == "parsed":
+        return f"{STAGE_TITLES[event]} — {data['rows']} rows × {data['columns']} columns · {timing}"
+    if event == "classification":
+        return f"{STAGE_TITLES[event]} — **{data['label']}** ({data['confidence']}) · {timing}\n\n{data['reasoning']}"
+    if event == "statement":
+        return (f"{STAGE_TITLES[event]} — {data['transaction_count']} transactions, "
+                f"debits {data['total_debits']:,.2f}, credits {data['total_credits']:,.2f} · {timing}")
+    if event == "gemini":
+        return f"{STAGE_TITLES[event]} · {timing}\n\n{data.get('summary', '')}"
+    return f"{event} · {timing}"
+
+
+def analyze_streaming(file):
+    """
+    Posts one file to the streaming endpoint and renders each pipeline
+    stage as soon as its event arrives. Returns the final result row.
+    """
+    files = {"file": (file.name, file.getvalue(), file.type)}
+    with st.status(f"Analyzing {file.name}", expanded=True) as status:
+        with requests.post(STREAM_URL, files=files, timeout=120, stream=True) as response:
+            if response.status_code != 200:
+                status.update(label=f"❌ {file.name}", state="error")
+                return {"Filename": file.name, "Error": response.text}
+
+            for event, data in iter_sse(response):
+                if event == "done":
+                    status.update(label=f"✅ {file.name} — {data.get('elapsed_s', 0):.2f}s", state="complete")
+                    return data
+                if event == "error":
+                    status.update(label=f"❌ {file.name}", state="error")
+                    return {"Filename": file.name, "Error": data["error"]}
+                st.markdown(describe_stage(event, data))
+
+    return {"Filename": file.name, "Error": "Stream ended before the result arrived."}
 
 # =============================================================
 # 🔹 HEADER
@@ -101,6 +169,7 @@ with col1:
         accept_multiple_files=True
     )
 with col2:
+    live_stages = st.toggle("⚡ Live stage updates", value=True)
     if st.button("🔁 Reset / Re-upload"):
         st.session_state.results = []
         st.session_state.processing = False
@@ -129,16 +198,23 @@ if uploaded_files and not st.session_state.processing:
         """, unsafe_allow_html=True)
 
         try:
-            files = {"file": (file.name, file.getvalue(), file.type)}
-            response = requests.post(BACKEND_URL, files=files, timeout=120)
-
-            if response.status_code == 200:
-                data = response.json()
-                data.setdefault("Latency (s)", 0)
-                data.setdefault("CPU Usage (%)", 0)
+            if live_stages:
+                data = analyze_streaming(file)
+                if "Error" not in data:
+                    data.setdefault("Latency (s)", 0)
+                    data.setdefault("CPU Usage (%)", 0)
                 st.session_state.results.append(data)
             else:
-                st.session_state.results.append({"Filename": file.name, "Error": response.text})
+                files = {"file": (file.name, file.getvalue(), file.type)}
+                response = requests.post(BACKEND_URL, files=files, timeout=120)
+
+                if response.status_code == 200:
+                    data = response.json()
+                    data.setdefault("Latency (s)", 0)
+                    data.setdefault("CPU Usage (%)", 0)
+                    st.session_state.results.append(data)
+                else:
+                    st.session_state.results.append({"Filename": file.name, "Error": response.text})
         except Exception as e:
             st.session_state.results.append({"Filename": file.name, "Error": str(e)})
 